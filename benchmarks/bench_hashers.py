@@ -0,0 +1,59 @@
+"""
+Password checks (i.e. logins) per second per core for each hashing profile.
+
+Each profile is driven by as many concurrent threads as there are cores.
+
+    python benchmarks/bench_hashers.py [seconds-per-profile]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import PASSWORD
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import override_settings
+
+CORES = os.cpu_count() or 1
+BCRYPT = ["rango.hashers.PooledBCryptSHA256PasswordHasher"]
+PROFILES = [
+    ("bcrypt 12, inline", BCRYPT, 12, 0),
+    ("bcrypt 12, pool", BCRYPT, 12, CORES),
+    ("bcrypt 10, pool", BCRYPT, 10, CORES),
+    ("test (md5)", ["django.contrib.auth.hashers.MD5PasswordHasher"], 4, 0),
+]
+
+
+def logins_per_second(encoded, seconds):
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            check_password(PASSWORD, encoded)
+            done += 1
+        return done
+
+    with ThreadPoolExecutor(CORES) as threads:
+        total = sum(threads.map(lambda _: worker(), range(CORES)))
+    return total / seconds
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{CORES} core(s)")
+    print(f"{'profile':>18} {'logins/s':>10} {'per core':>10}")
+    for name, hashers, rounds, processes in PROFILES:
+        with override_settings(
+            PASSWORD_HASHERS=hashers,
+            RANGO_BCRYPT_ROUNDS=rounds,
+            RANGO_HASHER_PROCESSES=processes,
+        ):
+            encoded = make_password(PASSWORD)
+            rate = logins_per_second(encoded, seconds)
+        print(f"{name:>18} {rate:>10.1f} {rate / CORES:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Homepage latency at increasing numbers of pages.
+
+Compares the old sort-the-table leaderboard queries, with and without the
+likes/views indexes, against the cached leaderboards that index now reads.
+
+    python benchmarks/bench_index.py [10000,100000,1000000]
+"""
+
+import sys
+
+from common import parse_sizes, reset_database, seed, setup_database, timeit
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.models import Category, Page
+
+
+def sorted_queries():
+    list(Category.objects.order_by("-likes")[:5])
+    list(Page.objects.order_by("-views")[:5])
+
+
+def leaderboard_reads():
+    category_leaderboard.top()
+    page_leaderboard.top()
+
+
+def without_indexes(func):
+    indexes = [(Category, index) for index in Category._meta.indexes]
+    indexes += [(Page, index) for index in Page._meta.indexes]
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    try:
+        return func()
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+
+
+def main():
+    sizes = parse_sizes(sys.argv, [10_000, 100_000, 1_000_000])
+    setup_database()
+    client = Client()
+    url = reverse("rango:index")
+
+    print(
+        f"{'pages':>10} {'unindexed':>10} {'indexed':>10} {'cached':>10} {'GET /':>10}"
+    )
+    for size in sizes:
+        reset_database()
+        seed(max(size // 100, 1), size)
+
+        unindexed = without_indexes(lambda: timeit(sorted_queries, repeat=10))
+        indexed = timeit(sorted_queries)
+        leaderboard_reads()
+        cached = timeit(leaderboard_reads)
+        homepage = timeit(lambda: client.get(url))
+        print(
+            f"{size:>10} {unindexed:>9.3f}ms {indexed:>9.3f}ms "
+            f"{cached:>9.3f}ms {homepage:>9.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
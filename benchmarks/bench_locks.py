@@ -0,0 +1,152 @@
+"""
+Lock waits under a mixed read/write load on a file-backed SQLite database:
+SQLite's defaults (rollback journal, every read on the default connection)
+against RANGO_SQLITE_PRAGMAS with the replica router.
+
+Reader threads do what index/show_category do, reading a category's top
+pages; writer threads do what a view counter flush does, short transactions
+bumping views and touching the category. Time spent waiting on another
+connection's lock shows up in the read and write tail latencies, and as
+"database is locked" errors once busy_timeout runs out.
+
+    python benchmarks/bench_locks.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from common import seed, setup_database
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+from django.test import override_settings
+from django.utils import timezone
+
+from rango.models import Category, Page
+from rango.routers import use_replica
+
+MODES = {
+    "before": {
+        "DATABASE_ROUTERS": [],
+        "RANGO_SQLITE_PRAGMAS": [
+            ("journal_mode", "delete"),
+            ("synchronous", "full"),
+            ("busy_timeout", 5000),
+        ],
+    },
+    "after": {},
+}
+
+
+def read(category_ids):
+    with use_replica():
+        list(
+            Page.objects.filter(category_id=random.choice(category_ids)).order_by(
+                "-views", "-id"
+            )[:50]
+        )
+
+
+def write(category_ids, page_ids):
+    with transaction.atomic():
+        Page.objects.filter(pk__in=random.sample(page_ids, 20)).update(
+            views=F("views") + 1
+        )
+        Category.objects.filter(pk=random.choice(category_ids)).update(
+            updated_at=timezone.now()
+        )
+
+
+def worker(operation, deadline, samples, errors):
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:
+                errors.append(1)
+                continue
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        connections.close_all()
+
+
+def run(readers, writers, seconds):
+    category_ids = list(Category.objects.values_list("id", flat=True))
+    page_ids = list(Page.objects.values_list("id", flat=True))
+    connections.close_all()
+
+    reads, writes, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=worker, args=(lambda: read(category_ids), deadline, reads, errors)
+        )
+        for _ in range(readers)
+    ]
+    threads += [
+        threading.Thread(
+            target=worker,
+            args=(lambda: write(category_ids, page_ids), deadline, writes, errors),
+        )
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return reads, writes, len(errors)
+
+
+def journal_mode():
+    with connections["default"].cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        return cursor.fetchone()[0]
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[-1] if len(samples) > 1 else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        setup_database(os.path.join(directory, "bench.sqlite3"))
+        seed(args.categories, args.pages)
+
+        print(
+            f"{'mode':>8} {'journal':>8} {'reads/s':>9} {'read p50':>10} "
+            f"{'read p99':>10} {'writes/s':>9} {'write p99':>10} {'locked':>7}"
+        )
+        for mode, overrides in MODES.items():
+            # journal_mode only changes once every connection is closed
+            connections.close_all()
+            with override_settings(**overrides):
+                reads, writes, locked = run(args.readers, args.writers, args.seconds)
+                journal = journal_mode()
+            print(
+                f"{mode:>8} {journal:>8} {len(reads) / args.seconds:>9.0f} "
+                f"{statistics.median(reads):>8.2f}ms {p99(reads):>8.2f}ms "
+                f"{len(writes) / args.seconds:>9.0f} {p99(writes):>8.2f}ms "
+                f"{locked:>7}"
+            )
+    finally:
+        connections.close_all()
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
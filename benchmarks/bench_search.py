@@ -0,0 +1,40 @@
+"""
+Search latency against the FTS5 index versus a LIKE '%q%' table scan.
+
+    python benchmarks/bench_search.py [10000,100000,1000000]
+"""
+
+import sys
+
+from common import parse_sizes, reset_database, seed, setup_database, timeit
+
+from rango import search
+from rango.models import Page
+
+QUERIES = ["page 4242", "category", "example 99"]
+
+
+def main():
+    sizes = parse_sizes(sys.argv, [10_000, 100_000, 1_000_000])
+    setup_database()
+
+    print(f"{'pages':>10} {'query':>12} {'LIKE scan':>10} {'fts5':>10} {'fts5 p2':>10}")
+    for size in sizes:
+        reset_database()
+        seed(max(size // 100, 1), size)
+
+        for query in QUERIES:
+            scan = timeit(
+                lambda: list(Page.objects.filter(title__icontains=query)[:21]),
+                repeat=10,
+            )
+            fts = timeit(lambda: search.search(query))
+            second = timeit(lambda: search.search(query, page=2))
+            print(
+                f"{size:>10} {query:>12} {scan:>9.3f}ms {fts:>9.3f}ms "
+                f"{second:>9.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+django_session writes per request for each session engine, for logged-in
+users browsing index/about while visitor tracking keeps its counter in the
+session.
+
+"legacy" re-saves the counter on every hit, as the old visitor_cookie_handler
+did, so each request marks the session modified with unchanged data.
+The cached engines use prod's file-based "sessions" cache, in a throwaway
+directory.
+
+    python benchmarks/bench_sessions.py [users] [hits-per-user]
+"""
+
+import atexit
+import shutil
+import sys
+import tempfile
+
+from common import PASSWORD, seed, setup_database
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "rango": "rango.sessions",
+}
+VISITOR_BACKENDS = {
+    "legacy": "bench_visitors.LegacySessionBackend",
+    "session": "rango.visitors.SessionVisitorBackend",
+}
+
+
+def session_writes(captured):
+    return sum(
+        q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        and '"django_session"' in q["sql"]
+        for q in captured.captured_queries
+    )
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    hits = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    setup_database()
+    seed(10, 100, users=users)
+    urls = [reverse("rango:index"), reverse("rango:about")]
+    location = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, location, True)
+    caches = {
+        **settings.CACHES,
+        "sessions": {**settings.CACHES["sessions"], "LOCATION": location},
+    }
+
+    print(
+        f"{'engine':>10} {'visitors':>9} {'requests':>9} {'writes':>7} "
+        f"{'per request':>12}"
+    )
+    for name, engine in ENGINES.items():
+        for tracking, backend in VISITOR_BACKENDS.items():
+            with override_settings(
+                CACHES=caches,
+                SESSION_ENGINE=engine,
+                RANGO_VISITOR_BACKEND=backend,
+            ):
+                clients = []
+                for user in User.objects.all():
+                    client = Client()
+                    client.login(username=user.username, password=PASSWORD)
+                    clients.append(client)
+                with CaptureQueriesContext(connection) as captured:
+                    for client in clients:
+                        for hit in range(hits):
+                            client.get(urls[hit % len(urls)])
+            writes = session_writes(captured)
+            requests = len(clients) * hits
+            print(
+                f"{name:>10} {tracking:>9} {requests:>9} {writes:>7} "
+                f"{writes / requests:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
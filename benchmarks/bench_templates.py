@@ -0,0 +1,74 @@
+"""
+Render time per template under templates/rango with the prod template
+settings: cold (the cached loader emptied, so every render reads and parses
+the template again, as the first request after a deploy would without a
+warm-up) against warm (compiled once, then rendered from memory).
+
+    python benchmarks/bench_templates.py
+"""
+
+from common import seed, setup_database, timeit
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.test import RequestFactory
+
+from rango.forms import (
+    BulkPageForm,
+    CategoryForm,
+    PageForm,
+    UserForm,
+    UserProfileForm,
+)
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.models import Category
+from rango.warmup import template_names
+
+
+def contexts():
+    category = Category.objects.order_by("name").first()
+    pages = list(category.page_set.order_by("-views")[:50])
+    return {
+        "rango/index.html": {
+            "categories": category_leaderboard.top(),
+            "pages": page_leaderboard.top(),
+        },
+        "rango/about.html": {"visits": 1},
+        "rango/category.html": {"category": category, "pages": pages},
+        "rango/page_list.html": {"pages": pages},
+        "rango/add_category.html": {"form": CategoryForm()},
+        "rango/add_page.html": {"form": PageForm(), "category": category},
+        "rango/add_pages.html": {"form": BulkPageForm(), "category": category},
+        "rango/register.html": {
+            "user_form": UserForm(),
+            "profile_form": UserProfileForm(),
+        },
+    }
+
+
+def main():
+    setup_database()
+    seed(20, 1000)
+
+    (backend,) = engines.all()
+    (loader,) = backend.engine.template_loaders
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    context_for = contexts()
+
+    def render(name):
+        backend.get_template(name).render(context_for.get(name, {}), request)
+
+    def cold(name):
+        loader.reset()
+        render(name)
+
+    print(f"{'template':>24} {'cold':>10} {'warm':>10}")
+    for _, name in template_names():
+        render(name)  # fill the sidebar and leaderboard caches first
+        cold_ms = timeit(lambda: cold(name))
+        warm_ms = timeit(lambda: render(name))
+        print(f"{name:>24} {cold_ms:>8.3f}ms {warm_ms:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
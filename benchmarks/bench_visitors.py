@@ -0,0 +1,60 @@
+"""
+Database writes per request for each visitor tracking backend.
+
+"legacy" saves the counter into the session on every hit, as the old
+visitor_cookie_handler did.
+
+    python benchmarks/bench_visitors.py [visitors] [hits-per-visitor]
+"""
+
+import sys
+
+from common import setup_database
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rango.visitors import SessionVisitorBackend
+
+BACKENDS = {
+    "legacy": f"{__name__}.LegacySessionBackend",
+    "session": "rango.visitors.SessionVisitorBackend",
+    "cache": "rango.visitors.CacheVisitorBackend",
+    "cookie": "rango.visitors.SignedCookieVisitorBackend",
+}
+
+
+class LegacySessionBackend(SessionVisitorBackend):
+    def load(self, request):
+        stored = super().load(request)
+        if stored is not None:
+            # touching the session marks it modified, so it is saved every time
+            self.save(request, None, *stored)
+        return stored
+
+
+def main():
+    visitors = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    hits = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    setup_database()
+    urls = [reverse("rango:index"), reverse("rango:about")]
+
+    print(f"{'backend':>8} {'requests':>9} {'writes':>7} {'writes/request':>15}")
+    for name, backend in BACKENDS.items():
+        with override_settings(RANGO_VISITOR_BACKEND=backend):
+            with CaptureQueriesContext(connection) as captured:
+                for _ in range(visitors):
+                    client = Client()
+                    for hit in range(hits):
+                        client.get(urls[hit % len(urls)])
+        writes = sum(
+            q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            for q in captured.captured_queries
+        )
+        requests = visitors * hits
+        print(f"{name:>8} {requests:>9} {writes:>7} {writes / requests:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+isort:skip_file
+"""
+
+# flake8:noqa
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings.prod"
+)
+
+import django
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_databases, setup_test_environment
+
+from rango import search
+from rango.models import Category, Page
+
+PASSWORD = "benchmark-password"
+
+
+def setup_database(name=None):
+    """
+    Create a throwaway test database so benchmarks never touch db.sqlite3,
+    in memory unless a file name is given. The replica alias mirrors it.
+    """
+    setup_test_environment()
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    use_throwaway_file_caches()
+    setup_databases(verbosity=0, interactive=False)
+    cache.clear()
+    collect_static()
+
+
+def use_throwaway_file_caches():
+    """Point prod's file-based caches (sessions, versions) at a temp dir."""
+    root = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, root, True)
+    override_settings(
+        CACHES={
+            alias: (
+                dict(config, LOCATION=os.path.join(root, alias))
+                if config["BACKEND"].endswith("FileBasedCache")
+                else config
+            )
+            for alias, config in settings.CACHES.items()
+        }
+    ).enable()
+
+
+def collect_static():
+    """
+    {% static %} needs a manifest under the prod storage; collect into a
+    throwaway STATIC_ROOT rather than the deployed one.
+    """
+    settings.STATIC_ROOT = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, settings.STATIC_ROOT, True)
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+
+def reset_database():
+    # raw deletes: going through the ORM would fire a signal per row
+    with connection.cursor() as cursor:
+        for model in (Page, Category, User):
+            cursor.execute(f"DELETE FROM {model._meta.db_table}")
+    search.rebuild()
+    cache.clear()
+
+
+def seed(categories, pages, users=0, batch_size=5000):
+    """
+    Bulk-load deterministic synthetic data. Users are named user0, user1, ...
+    and all share PASSWORD.
+    """
+    Category.objects.bulk_create(
+        (
+            Category(name=f"Category {i}", slug=f"category-{i}", likes=i % 997)
+            for i in range(categories)
+        ),
+        batch_size=batch_size,
+    )
+    category_ids = list(Category.objects.values_list("id", flat=True))
+
+    batch = []
+    for i in range(pages):
+        batch.append(
+            Page(
+                category_id=category_ids[i % len(category_ids)],
+                title=f"Page {i}",
+                url=f"http://example.com/{i}/",
+                url_normalized=f"http://example.com/{i}",
+                views=(i * 7919) % 100003,
+            )
+        )
+        if len(batch) >= batch_size:
+            Page.objects.bulk_create(batch)
+            batch = []
+    Page.objects.bulk_create(batch)
+
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f"user{i}", password=password) for i in range(users)
+    )
+    search.rebuild()
+    cache.clear()
+
+
+def timeit(func, repeat=50):
+    """Run func repeat times and return the median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def parse_sizes(argv, default):
+    if len(argv) > 1:
+        return [int(size) for size in argv[1].split(",")]
+    return default
@@ -0,0 +1,252 @@
+"""
+Request-path benchmark for every URL in rango/urls.py.
+
+Seeds synthetic data, then drives each URL through the Django test client
+and through a real WSGI server (wsgiref, in a thread), reporting p50/p95/p99
+latency, queries per request and peak RSS. Results can be written as JSON
+and compared against an earlier run:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --baseline before.json --threshold 0.2
+
+The run fails (exit status 1) when any URL's p95 latency grows by more than
+the threshold, or it issues more queries per request than the baseline.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from common import PASSWORD, seed, setup_database
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client
+from django.urls import reverse
+
+from rango import urls
+from rango.counters import view_counters
+from rango.models import Category, Page
+
+
+def query_count(server_timing):
+    # MetricsMiddleware counts queries from every thread that served the
+    # request, which a per-connection CaptureQueriesContext would not
+    match = re.search(r'desc="(\d+) queries"', server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_targets():
+    """One (name, path, login) per URL pattern, filled in from the seed data."""
+    category = Category.objects.order_by("id").first()
+    page = Page.objects.order_by("id").first()
+    kwargs = {"category_name_slug": category.slug}
+    query = {
+        "goto": f"?page_id={page.id}",
+        "search": "?q=page",
+    }
+    login = {"add_category", "add_page", "logout", "restricted"}
+
+    targets = []
+    for pattern in urls.urlpatterns:
+        name = pattern.name
+        if name is None:
+            # unversioned API aliases of named URLs
+            continue
+        path = reverse(
+            f"{urls.app_name}:{name}",
+            kwargs={key: kwargs[key] for key in pattern.pattern.converters},
+        )
+        targets.append((name, path + query.get(name, ""), name in login))
+    # logging out last keeps the session the other targets use alive
+    return sorted(targets, key=lambda target: target[0] == "logout")
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Server:
+    def __init__(self):
+        self.httpd = make_server(
+            "127.0.0.1", 0, WSGIHandler(), WSGIServer, handler_class=QuietHandler
+        )
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self.httpd.server_port
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def drive_client(targets, requests):
+    anonymous = Client()
+    authenticated = Client()
+    authenticated.login(username="user0", password=PASSWORD)
+
+    results = {}
+    for name, path, login in targets:
+        client = authenticated if login else anonymous
+        samples, queries = [], []
+        for _ in range(requests):
+            if name == "logout":
+                client.login(username="user0", password=PASSWORD)
+            start = time.perf_counter()
+            response = client.get(path)
+            samples.append(time.perf_counter() - start)
+            queries.append(query_count(response.get("Server-Timing")))
+        results[name] = summarise(samples, queries)
+    return results
+
+
+def drive_server(targets, requests):
+    client = Client()
+    client.login(username="user0", password=PASSWORD)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    results = {}
+    with Server() as port:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        for name, path, login in targets:
+            headers = {"Host": "localhost"}
+            if login:
+                headers["Cookie"] = f"{settings.SESSION_COOKIE_NAME}={session}"
+            if name == "logout":
+                # logging out would end the session every other request uses
+                continue
+            samples, queries = [], []
+            for _ in range(requests):
+                start = time.perf_counter()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                samples.append(time.perf_counter() - start)
+                queries.append(query_count(response.getheader("Server-Timing")))
+            results[name] = summarise(samples, queries)
+        conn.close()
+    return results
+
+
+def summarise(samples, queries=None):
+    summary = {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+    queries = [count for count in queries or () if count is not None]
+    if queries:
+        summary["queries"] = statistics.median_low(queries)
+    return summary
+
+
+def compare(results, baseline, threshold):
+    failures = []
+    for mode, urls_ in results["modes"].items():
+        for name, current in urls_.items():
+            before = baseline.get("modes", {}).get(mode, {}).get(name)
+            if before is None:
+                continue
+            if current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                failures.append(
+                    f"{mode} {name}: p95 {before['p95_ms']:.2f}ms -> "
+                    f"{current['p95_ms']:.2f}ms"
+                )
+            if current.get("queries", 0) > before.get("queries", math.inf):
+                failures.append(
+                    f"{mode} {name}: queries {before['queries']} -> "
+                    f"{current['queries']}"
+                )
+    return failures
+
+
+def report(results):
+    for mode, urls_ in results["modes"].items():
+        print(f"\n{mode}")
+        print(f"{'url':>14} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+        for name, r in urls_.items():
+            print(
+                f"{name:>14} {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms "
+                f"{r['p99_ms']:>7.2f}ms {r.get('queries', ''):>8}"
+            )
+    print(f"\npeak RSS {results['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_database()
+    seed(args.categories, args.pages, max(args.users, 1))
+    targets = build_targets()
+
+    results = {
+        "revision": git_revision(),
+        "scale": {
+            "categories": args.categories,
+            "pages": args.pages,
+            "users": args.users,
+            "requests": args.requests,
+        },
+        "modes": {
+            "client": drive_client(targets, args.requests),
+            "wsgi": drive_server(targets, args.requests),
+        },
+    }
+    view_counters.flush()
+    results["peak_rss_mb"] = peak_rss_mb()
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
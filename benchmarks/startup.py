@@ -0,0 +1,151 @@
+"""
+Worker cold-start report: time to import Django, load the settings, run
+django.setup() (split per app into importing the app, its models and its
+ready()), and build the WSGI application, as a fresh worker process would.
+
+    python benchmarks/startup.py --settings tango_with_django_project.settings.prod
+    python benchmarks/startup.py --target 500 --output before.json
+    python benchmarks/startup.py --baseline before.json --threshold 0.2
+
+The run fails (exit status 1) when the total exceeds --target milliseconds,
+or grows by more than the threshold over the baseline. Run it from the
+repository root; only the first run in a process measures anything.
+"""
+
+# isort:skip_file
+# flake8:noqa
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+START = time.perf_counter()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def elapsed_ms(since):
+    return (time.perf_counter() - since) * 1000
+
+
+def instrument_app_configs(timings):
+    """Time AppConfig import, import_models() and ready() per app label."""
+    from django.apps import AppConfig
+
+    create = AppConfig.create.__func__
+    import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        timings[app_config.label]["import"] += elapsed_ms(start)
+
+        ready = app_config.ready
+
+        def timed_ready():
+            start = time.perf_counter()
+            ready()
+            timings[app_config.label]["ready"] += elapsed_ms(start)
+
+        app_config.ready = timed_ready
+        return app_config
+
+    def timed_import_models(self):
+        start = time.perf_counter()
+        import_models(self)
+        timings[self.label]["models"] += elapsed_ms(start)
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+
+
+def measure(settings_module):
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    phases = {}
+    apps = defaultdict(lambda: defaultdict(float))
+
+    start = time.perf_counter()
+    import django
+
+    phases["import django"] = elapsed_ms(start)
+
+    start = time.perf_counter()
+    from django.conf import settings
+
+    settings.INSTALLED_APPS
+    phases["settings"] = elapsed_ms(start)
+
+    instrument_app_configs(apps)
+    start = time.perf_counter()
+    django.setup()
+    phases["django.setup()"] = elapsed_ms(start)
+
+    # middleware, the URLconf and, when enabled, the template warm-up
+    start = time.perf_counter()
+    from django.urls import get_resolver
+
+    from tango_with_django_project import wsgi
+
+    get_resolver().url_patterns
+    phases["wsgi application"] = elapsed_ms(start)
+
+    return {
+        "settings": settings_module,
+        "phases": phases,
+        "apps": {label: dict(parts) for label, parts in apps.items()},
+        "total_ms": sum(phases.values()),
+        "process_ms": elapsed_ms(START),
+    }
+
+
+def report(results):
+    print(f"{'app':>14} {'import':>9} {'models':>9} {'ready':>9} {'total':>9}")
+    for label, parts in results["apps"].items():
+        cells = [parts.get(part, 0) for part in ("import", "models", "ready")]
+        print(
+            f"{label:>14} "
+            + " ".join(f"{cell:>7.2f}ms" for cell in cells)
+            + f" {sum(cells):>7.2f}ms"
+        )
+    in_apps = sum(sum(parts.values()) for parts in results["apps"].values())
+    outside = results["phases"]["django.setup()"] - in_apps
+    print(f"{'(outside apps)':>14} {outside:>39.2f}ms")
+    print()
+    for phase, ms in results["phases"].items():
+        print(f"{phase:>24} {ms:>8.2f}ms")
+    print(f"{'total':>24} {results['total_ms']:>8.2f}ms ({results['settings']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--settings", default="tango_with_django_project.settings.prod")
+    parser.add_argument("--target", type=float, help="fail above this many ms")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = measure(args.settings)
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if args.target is not None and results["total_ms"] > args.target:
+        failures.append(f"total {results['total_ms']:.2f}ms > {args.target:.2f}ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            before = json.load(f)["total_ms"]
+        if results["total_ms"] > before * (1 + args.threshold):
+            failures.append(f"total {before:.2f}ms -> {results['total_ms']:.2f}ms")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
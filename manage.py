@@ -1,13 +1,15 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
+
 import os
 import sys
 
 
 def main():
-    os.environ.setdefault(
-        "DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings"
-    )
+    settings_module = "tango_with_django_project.settings.dev"
+    if sys.argv[1:2] == ["test"]:
+        settings_module = "tango_with_django_project.settings.test"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -4,13 +4,18 @@
 # flake8:noqa
 import os
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings")
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings.dev"
+)
 
 import django
 
 django.setup()
 
-from rango.models import Category, Page
+from django.db import transaction
+
+from rango.importer import BulkImporter
+from rango.models import Page
 
 
 def populate():
@@ -60,28 +65,16 @@ def populate():
     # If you want to add more categories or pages,
     # add them to the dictionaries above.
 
-    for cat, cat_data in cats.items():
-        c = add_cat(cat, cat_data["views"], cat_data["likes"])
-        for p in cat_data["pages"]:
-            add_page(c, p["title"], p["url"], p["views"])
-
-    for c in Category.objects.all():
-        for p in Page.objects.filter(category=c):
-            print(f"- {c}: {p}")
-
-
-def add_page(cat, title, url, views=0):
-    p = Page.objects.get_or_create(category=cat, title=title)[0]
-    p.url = url
-    p.views = views
-    p.save()
-    return p
-
+    with transaction.atomic():
+        importer = BulkImporter()
+        for cat, cat_data in cats.items():
+            importer.add_category(cat, cat_data["views"], cat_data["likes"])
+            for p in cat_data["pages"]:
+                importer.add_page(cat, p["title"], p["url"], p["views"])
+        importer.finish()
 
-def add_cat(name, views, likes):
-    c = Category.objects.get_or_create(name=name, views=views, likes=likes)[0]
-    c.save()
-    return c
+    for p in Page.objects.select_related("category").order_by("category_id", "id"):
+        print(f"- {p.category}: {p}")
 
 
 if __name__ == "__main__":
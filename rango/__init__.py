@@ -0,0 +1 @@
+default_app_config = "rango.apps.RangoConfig"
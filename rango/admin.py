@@ -1,14 +1,41 @@
 from django.contrib import admin
 
+from rango.forms import PageAdminForm
 from rango.models import Category, Page, UserProfile
 
 
 class PageAdmin(admin.ModelAdmin):
+    form = PageAdminForm
     list_display = ("title", "category", "url")
+    list_select_related = ("category",)
 
 
 class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
+    list_display = (
+        "name",
+        "views",
+        "likes",
+        "page_count",
+        "total_page_views",
+        "top_page",
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+
+    def page_count(self, obj):
+        return obj.page_count
+
+    page_count.admin_order_field = "page_count"
+
+    def total_page_views(self, obj):
+        return obj.total_page_views
+
+    total_page_views.admin_order_field = "total_page_views"
+
+    def top_page(self, obj):
+        return obj.top_page
 
 
 admin.site.register(Category, CategoryAdmin)
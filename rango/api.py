@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from rango.models import Category, Page
+from rango.pagination import (
+    decode_cursor,
+    keyset_paginate,
+    order_by_views,
+    parse_id,
+    query_flag,
+)
+from rango.routers import read_only_view
+from rango.slugs import category_from_slug
+
+VERSION = 1
+
+CATEGORY_FIELDS = ("id", "name", "slug", "views", "likes", "updated_at")
+CATEGORY_STATS = ("page_count", "total_page_views", "top_page")
+PAGE_FIELDS = ("id", "title", "url", "views", "updated_at")
+
+
+def api_view(view):
+    """GET only, read from the replica, gzipped when the client accepts it."""
+    return gzip_page(require_GET(read_only_view(view)))
+
+
+def error(message, status=400):
+    return JsonResponse({"version": VERSION, "error": message}, status=status)
+
+
+def parse_fields(request, allowed):
+    """The fields asked for with ?fields=a,b (all of allowed by default)."""
+    names = [name.strip() for name in request.GET.get("fields", "").split(",")]
+    fields = list(dict.fromkeys(name for name in names if name)) or list(allowed)
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}.")
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get("limit", settings.RANGO_API_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be a whole number.")
+    return min(max(limit, 1), settings.RANGO_API_MAX_PAGE_SIZE)
+
+
+def select(queryset, fields, keys):
+    """
+    values() for fields plus the keys pagination needs, so no other column
+    is read and no model instance is built. Returns the queryset and the
+    keys to drop from each row before it is sent.
+    """
+    hidden = [key for key in keys if key not in fields]
+    return queryset.values(*fields, *hidden), hidden
+
+
+def strip(row, hidden):
+    for key in hidden:
+        del row[key]
+    return row
+
+
+def page_response(request, rows, hidden, next_cursor):
+    next_url = None
+    if next_cursor is not None:
+        params = request.GET.copy()
+        params["after"] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    return JsonResponse(
+        {
+            "version": VERSION,
+            "results": [strip(row, hidden) for row in rows],
+            "next": next_url,
+        }
+    )
+
+
+def stream_response(queryset, hidden):
+    """
+    The whole queryset as one JSON document, encoded and sent a chunk of
+    rows at a time so no more than one chunk is ever held in memory.
+    """
+    # pin the database now: the rows are read after the view has returned
+    queryset = queryset.using(queryset.db)
+    chunk_size = settings.RANGO_STREAM_CHUNK_SIZE
+    encode = DjangoJSONEncoder().encode
+
+    def chunks():
+        yield f'{{"version": {VERSION}, "results": ['
+        separator, chunk = "", []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(encode(strip(row, hidden)))
+            if len(chunk) >= chunk_size:
+                yield separator + ",".join(chunk)
+                separator, chunk = ",", []
+        if chunk:
+            yield separator + ",".join(chunk)
+        yield '], "next": null}'
+
+    return StreamingHttpResponse(chunks(), content_type="application/json")
+
+
+@api_view
+def categories(request):
+    """
+    Categories by id. ?fields= may also ask for page_count,
+    total_page_views and top_page, computed in the same query.
+    """
+    try:
+        fields = parse_fields(request, CATEGORY_FIELDS + CATEGORY_STATS)
+        limit = parse_limit(request)
+    except ValueError as e:
+        return error(str(e))
+
+    queryset = Category.objects.order_by("id")
+    if any(field in CATEGORY_STATS for field in fields):
+        queryset = queryset.with_stats()
+    queryset, hidden = select(queryset, fields, ["id"])
+    if query_flag(request, "stream"):
+        return stream_response(queryset, hidden)
+
+    after = request.GET.get("after")
+    if after:
+        try:
+            queryset = queryset.filter(id__gt=parse_id(after))
+        except ValueError:
+            return error("Invalid cursor.")
+    rows = list(queryset[: limit + 1])
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return page_response(request, rows[:limit], hidden, next_cursor)
+
+
+@api_view
+def category_pages(request, category_name_slug):
+    """A category's pages, most viewed first."""
+    try:
+        fields = parse_fields(request, PAGE_FIELDS)
+        limit = parse_limit(request)
+    except ValueError as e:
+        return error(str(e))
+
+    category = category_from_slug(category_name_slug)
+    if category is None:
+        return error("No such category.", status=404)
+
+    queryset, hidden = select(
+        Page.objects.filter(category_id=category.id), fields, ["views", "id"]
+    )
+    if query_flag(request, "stream"):
+        return stream_response(order_by_views(queryset), hidden)
+
+    after = request.GET.get("after")
+    if after and decode_cursor(after) is None:
+        return error("Invalid cursor.")
+    page = keyset_paginate(queryset, after, limit)
+    return page_response(request, page.object_list, hidden, page.next_cursor)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class RangoConfig(AppConfig):
     name = "rango"
+
+    def ready(self):
+        import rango.db  # noqa: F401
+        import rango.signals  # noqa: F401
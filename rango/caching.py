@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def version_cache():
+    return caches[settings.RANGO_VERSION_CACHE_ALIAS]
+
+
+def version_key(name):
+    return f"rango:version:{name}"
+
+
+def get_version(name):
+    """
+    Current version number for a group of cached entries.
+
+    Cached entries embed this number in their keys, so bumping it retires
+    every old entry at once without having to find and delete them.
+    """
+    cache = version_cache()
+    key = version_key(name)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version key that was evicted never comes
+        # back with a number that stale entries are still stored under.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    cache = version_cache()
+    key = version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        get_version(name)
+        return cache.incr(key)
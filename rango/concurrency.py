@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from rango.metrics import current_stats, set_stats
+from rango.routers import replica_reads, set_replica_reads
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RANGO_QUERY_WORKERS,
+                thread_name_prefix="rango-query",
+            )
+        return _executor
+
+
+def _run_in_worker(func, stats, replica):
+    # Worker threads keep their own DB connections, so they have to be
+    # recycled by hand the way request_started/finished do it for requests.
+    close_old_connections()
+    set_stats(stats)
+    set_replica_reads(replica)
+    try:
+        return func()
+    finally:
+        set_stats(None)
+        set_replica_reads(False)
+        close_old_connections()
+
+
+def run_parallel(*funcs):
+    """
+    Call each of funcs and return their results in order.
+
+    Independent ORM reads run side by side on a bounded thread pool, so a
+    view waits for its slowest query rather than the sum of them. Inside a
+    transaction everything runs inline, as other connections could not see
+    its uncommitted rows.
+    """
+    if (
+        len(funcs) < 2
+        or settings.RANGO_QUERY_WORKERS <= 0
+        or connection.in_atomic_block
+    ):
+        return [func() for func in funcs]
+
+    executor = get_executor()
+    stats, replica = current_stats(), replica_reads()
+    futures = [
+        executor.submit(_run_in_worker, func, stats, replica) for func in funcs[1:]
+    ]
+    results = [funcs[0]()]
+    results += [future.result() for future in futures]
+    return results
@@ -0,0 +1,68 @@
+import hashlib
+
+from rango.caching import get_version
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.models import Category
+from rango.slugs import category_slugs
+
+
+def make_etag(*parts):
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def category_for(request, slug):
+    """
+    The category at slug, or None. The etag, last-modified and view all need
+    it, so it is looked up once per request, by primary key once the slug
+    cache knows the slug.
+    """
+    if not hasattr(request, "_rango_category"):
+        category = None
+        found = category_slugs.get(slug)
+        if found is not None:
+            category = Category.objects.filter(id=found[0], slug=slug).first()
+            if category is None:
+                category_slugs.forget(slug)
+        request._rango_category = category
+    return request._rango_category
+
+
+def category_etag(request, category_name_slug):
+    category = category_for(request, category_name_slug)
+    if category is None:
+        return None
+    return make_etag(
+        category.id,
+        category.updated_at.isoformat(),
+        get_version("categories"),
+        request.user.pk,
+        request.GET.urlencode(),
+    )
+
+
+def category_last_modified(request, category_name_slug):
+    category = category_for(request, category_name_slug)
+    return category.updated_at if category else None
+
+
+def index_categories(request):
+    """The most liked categories with their page stats, once per request."""
+    if not hasattr(request, "_rango_index_categories"):
+        ids = [entry["id"] for entry in category_leaderboard.top()]
+        categories = Category.objects.with_stats().in_bulk(ids)
+        request._rango_index_categories = [
+            categories[pk] for pk in ids if pk in categories
+        ]
+    return request._rango_index_categories
+
+
+def index_etag(request):
+    # Signed-in users get their avatar on the index, which the leaderboards
+    # say nothing about, so only anonymous pages are validated.
+    if request.user.is_authenticated:
+        return None
+    stats = [
+        (c.pk, c.name, c.likes, c.page_count, c.total_page_views, c.top_page)
+        for c in index_categories(request)
+    ]
+    return make_etag(stats, page_leaderboard.top(), get_version("categories"))
@@ -0,0 +1,168 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+from rango.caching import bump_version, get_version
+
+# sent once per model after a flush, with the primary keys whose counts changed
+views_flushed = Signal(providing_args=["pks"])
+likes_flushed = Signal(providing_args=["pks"])
+
+logger = logging.getLogger(__name__)
+
+# bumped by the flush_view_counts command; every worker's timer flushes when
+# it sees a new number
+FLUSH_REQUESTS = "counter-flush-requests"
+
+
+def request_flush():
+    bump_version(FLUSH_REQUESTS)
+
+
+class ViewCounterBuffer:
+    """
+    Collects view hits (or hits on another counter field) in memory and
+    writes them back in batches.
+
+    Every hit on a hot page would otherwise be an UPDATE that takes the
+    SQLite write lock. Hits are summed per row and flushed with one
+    F() expression UPDATE per distinct increment, so a flush costs at
+    most one UPDATE per row no matter how many hits it carries.
+
+    Each process flushes its buffer from a daemon thread, started on the
+    first hit, at least every flush_interval seconds, and sooner when the
+    buffer fills up or request_flush() is called from any process.
+    """
+
+    def __init__(
+        self, flush_interval=None, max_pending=None, field="views", flushed=None
+    ):
+        self.field = field
+        self.flushed = views_flushed if flushed is None else flushed
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._last_flush = time.monotonic()
+        self._timer_pid = None
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return getattr(settings, "RANGO_VIEW_COUNTER_FLUSH_INTERVAL", 5.0)
+
+    @property
+    def max_pending(self):
+        if self._max_pending is not None:
+            return self._max_pending
+        return getattr(settings, "RANGO_VIEW_COUNTER_MAX_PENDING", 1000)
+
+    def incr(self, model, pk, hits=1):
+        with self._lock:
+            self._pending[(model, pk)] += hits
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            # the pid check restarts the timer in a process forked after it
+            start_timer = settings.RANGO_VIEW_COUNTER_TIMER and (
+                self._timer_pid != os.getpid()
+            )
+            if start_timer:
+                self._timer_pid = os.getpid()
+        if start_timer:
+            threading.Thread(
+                target=self._run_timer,
+                args=(get_version(FLUSH_REQUESTS),),
+                name=f"rango-{self.field}-flush",
+                daemon=True,
+            ).start()
+        if due:
+            self.try_flush()
+
+    def try_flush(self):
+        try:
+            self.flush()
+        except DatabaseError:
+            # e.g. SQLite "database is locked": the hits stay buffered for
+            # the next flush rather than failing the request that was due
+            logger.warning("Deferred %s counter flush", self.field, exc_info=True)
+
+    def _run_timer(self, seen):
+        while True:
+            time.sleep(min(self.flush_interval, 1.0))
+            try:
+                requested = get_version(FLUSH_REQUESTS)
+                with self._lock:
+                    elapsed = time.monotonic() - self._last_flush
+                    due = self._pending and (
+                        requested != seen or elapsed >= self.flush_interval
+                    )
+                seen = requested
+                if due:
+                    self.try_flush()
+                    # this thread's connection would never be closed otherwise
+                    connections.close_all()
+            except Exception:
+                logger.exception("%s counter flush timer", self.field)
+
+    def pending(self, model, pk):
+        with self._lock:
+            return self._pending.get((model, pk), 0)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        # model -> hits -> [pk, ...] so rows with the same increment share
+        # a single UPDATE ... WHERE id IN (...)
+        grouped = defaultdict(lambda: defaultdict(list))
+        for (model, pk), hits in pending.items():
+            grouped[model][hits].append(pk)
+
+        try:
+            with transaction.atomic():
+                for model, by_hits in grouped.items():
+                    for hits, pks in by_hits.items():
+                        model.objects.filter(pk__in=pks).update(
+                            **{self.field: F(self.field) + hits}
+                        )
+        except DatabaseError:
+            # put the hits back so they go out with the next flush
+            with self._lock:
+                for key, hits in pending.items():
+                    self._pending[key] += hits
+            raise
+
+        for model, by_hits in grouped.items():
+            pks = [pk for pks in by_hits.values() for pk in pks]
+            self.flushed.send(sender=model, pks=pks)
+        return len(pending)
+
+
+view_counters = ViewCounterBuffer()
+like_counters = ViewCounterBuffer(field="likes", flushed=likes_flushed)
+
+
+def _flush_at_exit():
+    for counters in (view_counters, like_counters):
+        try:
+            counters.flush()
+        except DatabaseError:
+            pass
+
+
+atexit.register(_flush_at_exit)
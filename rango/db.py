@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.RANGO_SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name} = {value}")
+        if connection.alias == settings.RANGO_REPLICA_DATABASE:
+            cursor.execute("PRAGMA query_only = 1")
@@ -1,6 +1,10 @@
+import json
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 
+from rango.links import normalize_url
 from rango.models import Category, Page, UserProfile
 
 
@@ -31,13 +35,102 @@ class PageForm(forms.ModelForm):
         model = Page
         exclude = ("category",)
 
+    def __init__(self, *args, category=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.category = category
+
     def clean(self):
         cleaned_data = self.cleaned_data
         url = cleaned_data.get("url")
 
-        if url and not url.startswith("http://"):
+        if url and not url.startswith(("http://", "https://")):
             url = f"http://{url}"
             cleaned_data["url"] = url
+        if (
+            url
+            and self.category is not None
+            and Page.objects.filter(
+                category_id=self.category.id, url_normalized=normalize_url(url)
+            ).exists()
+        ):
+            self.add_error("url", "This page is already in the category.")
+        return cleaned_data
+
+
+class PageAdminForm(forms.ModelForm):
+    """
+    The admin's Page form. Django 2.2 doesn't validate UniqueConstraints,
+    so the duplicate URL check PageForm makes is repeated here.
+    """
+
+    class Meta:
+        model = Page
+        fields = "__all__"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        url = cleaned_data.get("url")
+        category = cleaned_data.get("category")
+        instance = self.instance
+        # Page.save keeps a duplicate from before the constraint NULL
+        legacy = instance.pk is not None and instance.url_normalized is None
+        if (
+            url
+            and category is not None
+            and not legacy
+            and Page.objects.filter(
+                category=category, url_normalized=normalize_url(url)
+            )
+            .exclude(pk=instance.pk)
+            .exists()
+        ):
+            self.add_error("url", "This page is already in the category.")
+        return cleaned_data
+
+
+class BulkPageForm(forms.Form):
+    urls = forms.CharField(
+        widget=forms.Textarea,
+        required=False,
+        help_text="Paste one page per line: its URL, then optionally its title.",
+    )
+    upload = forms.FileField(
+        required=False,
+        help_text='Or upload a JSON list of {"title": ..., "url": ...} objects.',
+    )
+
+    def clean(self):
+        cleaned_data = self.cleaned_data
+        lines = []
+        for line in cleaned_data.get("urls", "").splitlines():
+            url, _, title = line.strip().partition(" ")
+            if url:
+                lines.append((title.strip(), url))
+        if cleaned_data.get("upload"):
+            try:
+                rows = json.load(cleaned_data["upload"])
+                lines += [(row.get("title", ""), row["url"]) for row in rows]
+            except (ValueError, TypeError, KeyError, AttributeError):
+                raise forms.ValidationError(
+                    'The upload must be a JSON list of {"title": ..., "url": ...}.'
+                )
+        if not lines:
+            raise forms.ValidationError("Paste or upload at least one page.")
+        if len(lines) > settings.RANGO_BULK_PAGE_LIMIT:
+            raise forms.ValidationError(
+                f"At most {settings.RANGO_BULK_PAGE_LIMIT} pages can be added at once."
+            )
+
+        url_field = forms.URLField(max_length=Page.URL_MAX_LENGTH)
+        cleaned_data["entries"], cleaned_data["rejected"] = [], []
+        for title, url in lines:
+            try:
+                url = url_field.clean(str(url))
+            except forms.ValidationError:
+                cleaned_data["rejected"].append(url)
+                continue
+            title = str(title).strip() or url
+            cleaned_data["entries"].append((title[: Page.TITLE_MAX_LENGTH], url))
         return cleaned_data
 
 
@@ -0,0 +1,54 @@
+import binascii
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the server process has threads running
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RANGO_HASHER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def hashpw(password, salt):
+    import bcrypt
+
+    return bcrypt.hashpw(password, salt)
+
+
+class PooledBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """
+    bcrypt_sha256 with the work factor taken from RANGO_BCRYPT_ROUNDS, run in
+    a pool of RANGO_HASHER_PROCESSES processes (0 hashes in the caller).
+
+    The pool caps how many cores a burst of logins can take from the rest of
+    the site. Hashes made with another work factor still verify, and Django
+    re-hashes them with the current one on the next successful login.
+    """
+
+    @property
+    def rounds(self):
+        return settings.RANGO_BCRYPT_ROUNDS
+
+    def encode(self, password, salt):
+        self._load_library()
+        # Hash the password prior to using bcrypt to prevent password
+        # truncation, as the parent class does.
+        password = binascii.hexlify(self.digest(password.encode()).digest())
+        if settings.RANGO_HASHER_PROCESSES > 0:
+            data = get_pool().submit(hashpw, password, salt).result()
+        else:
+            data = hashpw(password, salt)
+        return "%s$%s" % (self.algorithm, data.decode("ascii"))
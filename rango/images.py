@@ -0,0 +1,95 @@
+import hashlib
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from rango.models import UserProfile
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+VARIANT_DIR = "profile_images/variants"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RANGO_IMAGE_WORKERS,
+                thread_name_prefix="rango-images",
+            )
+        return _executor
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, FORMATS[fmt], quality=settings.RANGO_AVATAR_QUALITY)
+    return buffer.getvalue()
+
+
+def store(data, size, fmt):
+    # Named after the content, so identical uploads share one file and the
+    # URL can be cached forever.
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    name = f"{VARIANT_DIR}/{digest}-{size}.{fmt}"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_variants(profile_id):
+    """Resize a profile picture into every configured size and format."""
+    profile = UserProfile.objects.get(pk=profile_id)
+    if not profile.picture:
+        return {}
+
+    with profile.picture.open("rb") as f:
+        original = Image.open(f)
+        original.load()
+    original = original.convert("RGB")
+
+    variants = {}
+    for size in sorted(settings.RANGO_AVATAR_SIZES):
+        image = original.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+        variants[str(size)] = {
+            fmt: store(encode(image, fmt), size, fmt) for fmt in FORMATS
+        }
+
+    UserProfile.objects.filter(pk=profile_id).update(
+        picture_variants=json.dumps(variants)
+    )
+    return variants
+
+
+def _build_in_worker(profile_id):
+    close_old_connections()
+    try:
+        build_variants(profile_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(profile):
+    """
+    Build profile's picture variants off the request path once it commits.
+
+    With RANGO_IMAGE_WORKERS = 0 they are built inline instead.
+    """
+    if not profile.picture:
+        return
+    if settings.RANGO_IMAGE_WORKERS <= 0:
+        transaction.on_commit(lambda: build_variants(profile.pk))
+    else:
+        transaction.on_commit(
+            lambda: get_executor().submit(_build_in_worker, profile.pk)
+        )
@@ -0,0 +1,185 @@
+from django.template.defaultfilters import slugify
+
+from rango import search
+from rango.caching import bump_version
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.links import normalize_url
+from rango.models import Category, Page
+from rango.signals import purge_pages, touch_categories
+from rango.slugs import category_slugs
+
+
+class BulkImporter:
+    """
+    Loads categories and pages in batches, keyed so re-running is harmless.
+
+    Categories are matched on slug and pages on (category, title), the same
+    identities populate_rango.py used with get_or_create. Matching rows that
+    differ are updated with bulk_update, the rest inserted with bulk_create.
+    Callers should wrap the import in a transaction and call finish() at the
+    end.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.category_ids = {}
+        self.pending_categories = {}
+        # pending categories only named by a page, whose counters are unknown
+        self.placeholders = set()
+        self.pending_pages = {}
+        self.categories = 0
+        self.pages = 0
+        # page updates dropped because their URL belongs to another page
+        self.conflicts = 0
+
+    def add_category(self, name, views=0, likes=0):
+        slug = slugify(name)
+        self.pending_categories[slug] = Category(
+            name=name, slug=slug, views=views, likes=likes
+        )
+        self.placeholders.discard(slug)
+        if len(self.pending_categories) >= self.batch_size:
+            self.flush_categories()
+
+    def add_page(self, category, title, url, views=0):
+        slug = slugify(category)
+        if slug not in self.category_ids and slug not in self.pending_categories:
+            self.pending_categories[slug] = Category(name=category, slug=slug)
+            self.placeholders.add(slug)
+        self.pending_pages[(slug, title)] = Page(
+            title=title, url=url, url_normalized=normalize_url(url), views=views
+        )
+        if len(self.pending_pages) >= self.batch_size:
+            self.flush_pages()
+
+    def flush_categories(self):
+        if not self.pending_categories:
+            return
+        batch, self.pending_categories = self.pending_categories, {}
+        placeholders, self.placeholders = self.placeholders, set()
+
+        existing = dict(
+            Category.objects.filter(slug__in=batch).values_list("slug", "id")
+        )
+        updates = []
+        for slug, category in batch.items():
+            # a placeholder's zero counters must not overwrite the real ones
+            if slug in existing and slug not in placeholders:
+                category.id = existing[slug]
+                updates.append(category)
+        Category.objects.bulk_update(updates, ["views", "likes"])
+        Category.objects.bulk_create(
+            [c for slug, c in batch.items() if slug not in existing],
+            ignore_conflicts=True,
+        )
+        self.category_ids.update(
+            Category.objects.filter(slug__in=batch).values_list("slug", "id")
+        )
+        self.categories += len(batch)
+
+    def flush_pages(self):
+        self.flush_categories()
+        if not self.pending_pages:
+            return
+        batch, self.pending_pages = self.pending_pages, {}
+
+        for (slug, title), page in batch.items():
+            page.category_id = self.category_ids[slug]
+        existing = {
+            (category_id, title): (pk, url, views, normalized)
+            # title alone keeps this to one index probe per title; rows with
+            # the same title in other categories simply never match below
+            for pk, category_id, title, url, views, normalized in Page.objects.filter(
+                title__in={title for slug, title in batch}
+            ).values_list(
+                "id", "category_id", "title", "url", "views", "url_normalized"
+            )
+        }
+        updates, inserts = [], []
+        for page in batch.values():
+            current = existing.get((page.category_id, page.title))
+            if current is None:
+                inserts.append(page)
+            elif current[1:3] != (page.url, page.views):
+                page.id = current[0]
+                updates.append(page)
+        updates = self.without_conflicts(updates, existing)
+        Page.objects.bulk_update(updates, ["url", "url_normalized", "views"])
+        # a page whose URL is already in the category under another title is
+        # skipped rather than failing the whole batch
+        Page.objects.bulk_create(inserts, ignore_conflicts=True)
+        self.pages += len(batch)
+
+    def without_conflicts(self, updates, existing):
+        """
+        updates minus those whose normalized URL another page in the category
+        holds, counted in self.conflicts. As in Page.save, a duplicate from
+        before the constraint is still updated, keeping its NULL URL key.
+        """
+        held = {
+            (category_id, normalized): pk
+            for pk, category_id, normalized in Page.objects.filter(
+                category_id__in={page.category_id for page in updates},
+                url_normalized__in={page.url_normalized for page in updates},
+            ).values_list("id", "category_id", "url_normalized")
+        }
+        legacy = {current[0] for current in existing.values() if current[3] is None}
+        kept = []
+        for page in updates:
+            key = (page.category_id, page.url_normalized)
+            holder = held.get(key, page.id)
+            if holder != page.id and page.id in legacy:
+                page.url_normalized = None
+            elif holder != page.id:
+                self.conflicts += 1
+                continue
+            else:
+                held[key] = page.id
+            kept.append(page)
+        return kept
+
+    def finish(self):
+        self.flush_pages()
+        # bulk operations skip model signals, so retire the caches by hand
+        bump_version("categories")
+        category_slugs.invalidate()
+        category_leaderboard.invalidate()
+        page_leaderboard.invalidate()
+        search.rebuild()
+
+
+def add_pages(category, entries):
+    """
+    Insert (title, url) entries into category in one bulk_create, skipping
+    any whose normalized URL is already in the category or earlier in
+    entries. Returns the ids of the new pages and the skipped URLs.
+    """
+    pages, skipped = {}, []
+    for title, url in entries:
+        key = normalize_url(url)
+        if key in pages:
+            skipped.append(url)
+        else:
+            pages[key] = Page(
+                category_id=category.id, title=title, url=url, url_normalized=key
+            )
+    for key in Page.objects.filter(
+        category_id=category.id, url_normalized__in=pages
+    ).values_list("url_normalized", flat=True):
+        skipped.append(pages.pop(key).url)
+
+    # ignore_conflicts covers a concurrent add of the same URL
+    Page.objects.bulk_create(pages.values(), ignore_conflicts=True)
+    added = list(
+        Page.objects.filter(category_id=category.id, url_normalized__in=pages).only(
+            "id", "title", "url"
+        )
+    )
+
+    # bulk_create skips the post_save receivers in rango.signals
+    search.index_pages(added)
+    page_leaderboard.refresh([page.id for page in added])
+    touch_categories(id=category.id)
+    purge_pages(id=category.id)
+    bump_version("sidebar")
+    return [page.id for page in added], skipped
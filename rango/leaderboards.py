@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from rango.caching import bump_version, get_version
+from rango.models import Category, Page
+
+
+class Leaderboard:
+    """
+    A top-N list of rows kept in the cache, highest score first.
+
+    Reads never sort the table: the ranked entries come straight out of the
+    cache. Writes are merged into the list as they happen; only a change
+    that could let an unseen row into the top N (a score going down, or a
+    ranked row being deleted) drops the list so the next read rebuilds it
+    from the index.
+
+    The list lives in this process's cache under a version kept in the
+    RANGO_VERSION_CACHE_ALIAS cache. A write that changes the list bumps
+    the version, so every other worker rebuilds its copy on the next read.
+    """
+
+    def __init__(self, name, model, score_field, fields, size=5):
+        self.name = name
+        self.model = model
+        self.score_field = score_field
+        self.fields = ("id", score_field) + tuple(fields)
+        self.size = size
+
+    @property
+    def version(self):
+        return f"leaderboard:{self.name}"
+
+    def key_for(self, version):
+        return f"rango:leaderboard:{self.name}:{version}"
+
+    @property
+    def key(self):
+        return self.key_for(get_version(self.version))
+
+    @property
+    def timeout(self):
+        return getattr(settings, "RANGO_LEADERBOARD_TIMEOUT", 300)
+
+    def _rank(self, entry):
+        return (-entry[self.score_field], entry["id"])
+
+    def top(self):
+        entries = cache.get(self.key)
+        if entries is None:
+            entries = self.rebuild()
+        return entries
+
+    def rebuild(self):
+        entries = list(
+            self.model.objects.order_by(f"-{self.score_field}", "id").values(
+                *self.fields
+            )[: self.size]
+        )
+        cache.set(self.key, entries, self.timeout)
+        return entries
+
+    def invalidate(self):
+        bump_version(self.version)
+
+    def update(self, rows):
+        version = get_version(self.version)
+        entries = cache.get(self.key_for(version))
+        if entries is None:
+            # other workers may still hold a list the rows change
+            self.invalidate()
+            return
+
+        ranked = {entry["id"]: entry for entry in entries}
+        full = len(entries) >= self.size
+        for row in rows:
+            row = {field: row[field] for field in self.fields}
+            current = ranked.get(row["id"])
+            if current is not None:
+                if row[self.score_field] < current[self.score_field] and full:
+                    self.invalidate()
+                    return
+                ranked[row["id"]] = row
+            elif not full or self._rank(row) < self._rank(entries[-1]):
+                ranked[row["id"]] = row
+
+        merged = sorted(ranked.values(), key=self._rank)[: self.size]
+        if merged == entries:
+            return
+        # only store the merge if no other worker bumped in between
+        if bump_version(self.version) == version + 1:
+            cache.set(self.key_for(version + 1), merged, self.timeout)
+
+    def update_instance(self, instance):
+        self.update([{field: getattr(instance, field) for field in self.fields}])
+
+    def refresh(self, pks):
+        self.update(self.model.objects.filter(pk__in=pks).values(*self.fields))
+
+    def discard(self, pk):
+        entries = cache.get(self.key)
+        if entries is None or any(entry["id"] == pk for entry in entries):
+            self.invalidate()
+
+
+category_leaderboard = Leaderboard(
+    "categories", Category, "likes", fields=("name", "slug")
+)
+page_leaderboard = Leaderboard("pages", Page, "views", fields=("title", "url"))
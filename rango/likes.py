@@ -0,0 +1,69 @@
+import struct
+
+from rango.counters import like_counters
+from rango.models import Category, LikedCategories
+
+# ids are packed as unsigned 32-bit integers
+MAX_ID = 2**32 - 1
+
+
+def unpack_ids(packed):
+    packed = bytes(packed)
+    return struct.unpack(f"<{len(packed) // 4}I", packed)
+
+
+def pack_ids(ids):
+    ids = sorted(ids)
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+
+def liked_ids(packed):
+    return set(unpack_ids(packed))
+
+
+def add_liked(packed, ids):
+    """Return packed with ids added, and the ids that weren't in it before."""
+    liked = liked_ids(packed)
+    added = sorted(set(ids) - liked)
+    return pack_ids(liked.union(added)), added
+
+
+def mark_liked(user, category_ids):
+    """
+    Record that user likes category_ids and return the ones they hadn't
+    liked before. The new id list is swapped in with a compare-and-set
+    UPDATE on the row's version, so two batches from the same user racing
+    each other can't count a like twice, and no lock is held between the
+    read and the write.
+    """
+    while True:
+        row, _ = LikedCategories.objects.get_or_create(user=user)
+        new, added = add_liked(row.category_ids, category_ids)
+        if not added:
+            return []
+        if LikedCategories.objects.filter(user=user, version=row.version).update(
+            category_ids=new, version=row.version + 1
+        ):
+            return added
+
+
+def like_categories(user, category_ids):
+    """
+    Apply a batch of likes from user. Returns the like count of every
+    existing category in the batch and the ids newly liked by this batch.
+
+    Likes are added through like_counters, so however popular a category
+    is, it costs one UPDATE per flush rather than one per like. The counts
+    returned include likes still waiting for that flush.
+    """
+    counts = dict(
+        Category.objects.filter(pk__in=category_ids).values_list("id", "likes")
+    )
+    added = mark_liked(user, counts)
+    counts = {
+        pk: likes + like_counters.pending(Category, pk) + (pk in added)
+        for pk, likes in counts.items()
+    }
+    for pk in added:
+        like_counters.incr(Category, pk)
+    return counts, added
@@ -0,0 +1,247 @@
+import asyncio
+import ssl
+import time
+from collections import OrderedDict
+from urllib.parse import quote, urlsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# statuses a HEAD may get from servers that would answer a GET fine
+HEAD_FALLBACK = {403, 404, 405, 501}
+# GET bodies up to this size are read so the connection can be reused
+MAX_DRAIN = 64 * 1024
+
+
+class HTTPError(Exception):
+    pass
+
+
+async def read_head(reader):
+    """(version, status, headers) of the response at the start of reader."""
+    line = await reader.readline()
+    if not line:
+        raise HTTPError("connection closed")
+    try:
+        version, status = line.decode("latin-1").split(None, 2)[:2]
+        status = int(status)
+    except ValueError:
+        raise HTTPError(f"bad status line {line!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return version, status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections per (scheme, host, port), at most max_idle
+    in all; the least recently used host's are closed first.
+    """
+
+    def __init__(self, max_idle=100):
+        self.max_idle = max_idle
+        self.idle = OrderedDict()
+        self.opened = 0
+        self.ssl_context = ssl.create_default_context()
+
+    async def acquire(self, key):
+        """(reader, writer, reused) for key, reusing an idle connection if any."""
+        connections = self.idle.get(key)
+        if connections:
+            reader, writer = connections.pop()
+            if not connections:
+                del self.idle[key]
+            return reader, writer, True
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self.ssl_context if scheme == "https" else None
+        )
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, key, reader, writer):
+        self.idle.setdefault(key, []).append((reader, writer))
+        self.idle.move_to_end(key)
+        while sum(len(connections) for connections in self.idle.values()) > (
+            self.max_idle
+        ):
+            _, connections = self.idle.popitem(last=False)
+            for _, stale in connections:
+                stale.close()
+
+    def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+
+class LinkChecker:
+    """
+    Checks URLs with a HEAD request, falling back to GET when the HEAD is
+    refused, over keep-alive connections. At most `concurrency` checks run
+    at once, and at most `per_host` of them against any one host.
+    """
+
+    def __init__(self, concurrency=100, per_host=4, timeout=10.0):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.pool = ConnectionPool(max_idle=concurrency)
+        self.hosts = {}
+
+    async def check(self, url):
+        """(status or None if no response came back, latency in ms)."""
+        start = time.perf_counter()
+        try:
+            parts = urlsplit(url)
+            if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+                raise HTTPError(f"unsupported URL {url!r}")
+            async with self.host_slot(parts.hostname):
+                status = await asyncio.wait_for(
+                    self.request("HEAD", parts), self.timeout
+                )
+                if status in HEAD_FALLBACK:
+                    status = await asyncio.wait_for(
+                        self.request("GET", parts), self.timeout
+                    )
+        except (OSError, EOFError, asyncio.TimeoutError, HTTPError, ValueError):
+            # EOFError covers asyncio.IncompleteReadError, a body cut short
+            status = None
+        return status, (time.perf_counter() - start) * 1000
+
+    async def request(self, method, parts):
+        key = (parts.scheme, parts.hostname, parts.port or DEFAULT_PORTS[parts.scheme])
+        target = quote(parts.path or "/", safe="/%:@!$&'()*+,;=-._~")
+        if parts.query:
+            target += "?" + parts.query
+        host = parts.hostname
+        if parts.port and parts.port != DEFAULT_PORTS[parts.scheme]:
+            host = f"{host}:{parts.port}"
+        message = (
+            f"{method} {target} HTTP/1.1\r\nHost: {host}\r\n"
+            "User-Agent: rango-link-checker\r\nAccept: */*\r\n\r\n"
+        ).encode("latin-1", "replace")
+
+        while True:
+            reader, writer, reused = await self.pool.acquire(key)
+            try:
+                writer.write(message)
+                await writer.drain()
+                version, status, headers = await read_head(reader)
+                reusable = await self.drain(method, status, headers, reader)
+            except (OSError, HTTPError, asyncio.IncompleteReadError):
+                writer.close()
+                # the server may have dropped an idle connection; try the
+                # next one, or a new connection once the pool runs out
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if (
+                reusable
+                and version == "HTTP/1.1"
+                and (headers.get("connection", "").lower() != "close")
+            ):
+                self.pool.release(key, reader, writer)
+            else:
+                writer.close()
+            return status
+
+    async def drain(self, method, status, headers, reader):
+        """Read the body if that's cheap; True if the connection can be reused."""
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return True
+        length = headers.get("content-length")
+        if "chunked" in headers.get("transfer-encoding", "") or length is None:
+            return False
+        if not length.isdigit() or int(length) > MAX_DRAIN:
+            return False
+        await reader.readexactly(int(length))
+        return True
+
+    def host_slot(self, host):
+        slot = self.hosts.get(host)
+        if slot is None:
+            slot = self.hosts[host] = HostSlot(self, host)
+        return slot
+
+    async def run(self, rows, write, batch_size=500):
+        """
+        Check every (pk, url) in rows, passing (pk, status, latency) results
+        to write() in batches. Rows are pulled only as workers free up, so
+        rows can be a lazy iterator over any number of pages.
+        """
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results = []
+
+        async def worker():
+            while True:
+                row = await queue.get()
+                if row is None:
+                    return
+                pk, url = row
+                results.append((pk, *await self.check(url)))
+
+        async def put(row):
+            # a worker that died can't take its share of a full queue, so
+            # wait for either, and raise its error rather than wait forever
+            if not queue.full():
+                queue.put_nowait(row)
+                return
+            put = asyncio.ensure_future(queue.put(row))
+            await asyncio.wait([put, *workers], return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                for task in workers:
+                    if task.done():
+                        task.result()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            for row in rows:
+                await put(row)
+                if len(results) >= batch_size:
+                    write(results[:])
+                    results.clear()
+            for _ in workers:
+                await put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            self.pool.close()
+            # whatever was checked is kept, even if the run failed
+            if results:
+                write(results)
+
+
+class HostSlot:
+    """A per-host semaphore, dropped once nobody is using or waiting on it."""
+
+    def __init__(self, checker, host):
+        self.checker = checker
+        self.host = host
+        self.semaphore = asyncio.Semaphore(checker.per_host)
+        self.users = 0
+
+    async def __aenter__(self):
+        self.users += 1
+        try:
+            await self.semaphore.acquire()
+        except BaseException:
+            self.release()
+            raise
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+        self.release()
+
+    def release(self):
+        self.users -= 1
+        if not self.users:
+            del self.checker.hosts[self.host]
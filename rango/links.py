@@ -0,0 +1,27 @@
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url):
+    """
+    The form of url used to tell duplicate pages apart: a scheme added if
+    missing, scheme and host lowercased, the default port, fragment and
+    trailing slash dropped, and query parameters sorted. Percent-encoding
+    is left alone, so the result is never more than 8 characters longer.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    userinfo, at, host = parts.netloc.rpartition("@")
+    host = host.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and host.endswith(f":{default_port}"):
+        host = host[: -len(default_port) - 1]
+
+    path = parts.path.rstrip("/") or "/"
+    query = "&".join(sorted(param for param in parts.query.split("&") if param))
+    return urlunsplit((scheme, userinfo + at + host, path, query, ""))
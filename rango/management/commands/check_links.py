@@ -0,0 +1,78 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from rango.linkcheck import LinkChecker
+from rango.models import Page
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-check page URLs (HEAD, then GET if the HEAD is refused) and record "
+        "each page's status, latency and check time. Pages are streamed from "
+        "the database, so a run can cover any number of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            default=24,
+            help="only check pages not checked for this many hours",
+        )
+        parser.add_argument("--limit", type=int, help="check at most this many")
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--per-host", type=int, default=4)
+        parser.add_argument("--timeout", type=float, default=10)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["older_than"])
+        pages = (
+            Page.objects.filter(Q(checked_at__isnull=True) | Q(checked_at__lt=cutoff))
+            .order_by("id")
+            .values_list("id", "url")
+        )
+        if options["limit"] is not None:
+            pages = pages[: options["limit"]]
+
+        self.checked = self.broken = self.unreachable = 0
+        checker = LinkChecker(
+            concurrency=options["concurrency"],
+            per_host=options["per_host"],
+            timeout=options["timeout"],
+        )
+        start = time.perf_counter()
+        asyncio.run(
+            checker.run(
+                pages.iterator(chunk_size=options["batch_size"]),
+                self.record,
+                batch_size=options["batch_size"],
+            )
+        )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Checked {self.checked} page(s) in {elapsed:.2f}s "
+            f"({self.checked / max(elapsed, 1e-9):.0f}/sec, "
+            f"{checker.pool.opened} connection(s)): {self.broken} broken, "
+            f"{self.unreachable} unreachable."
+        )
+
+    def record(self, results):
+        # bulk_update leaves updated_at alone, so cached pages stay valid
+        now = timezone.now()
+        Page.objects.bulk_update(
+            [
+                Page(id=pk, check_status=status, check_latency=latency, checked_at=now)
+                for pk, status, latency in results
+            ],
+            ["check_status", "check_latency", "checked_at"],
+        )
+        self.checked += len(results)
+        self.broken += sum(1 for _, status, _ in results if status and status >= 400)
+        self.unreachable += sum(1 for _, status, _ in results if status is None)
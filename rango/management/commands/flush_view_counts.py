@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from rango.counters import like_counters, request_flush, view_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Ask every process buffering Category/Page view and like counts to "
+        "write them to the database; each does so within a second."
+    )
+
+    def handle(self, *args, **options):
+        request_flush()
+        rows = view_counters.flush() + like_counters.flush()
+        self.stdout.write(f"Requested a flush; flushed {rows} row(s) here.")
@@ -0,0 +1,87 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rango.importer import BulkImporter
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def as_int(value):
+    return int(value) if value not in (None, "") else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream categories and pages from a JSONL or CSV file into the database. "
+        'Category records have "name", "views" and "likes"; page records have '
+        '"category", "title", "url" and "views". Re-running updates existing rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="file to import, or - for stdin")
+        parser.add_argument("--format", choices=("jsonl", "csv"))
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        reader = read_csv if fmt == "csv" else read_jsonl
+
+        if path == "-":
+            self.load(reader(sys.stdin), options["batch_size"])
+        else:
+            try:
+                with open(path, newline="") as stream:
+                    self.load(reader(stream), options["batch_size"])
+            except OSError as e:
+                raise CommandError(e)
+
+    def load(self, records, batch_size):
+        importer = BulkImporter(batch_size=batch_size)
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            for record in records:
+                kind = record.get("type") or (
+                    "page" if record.get("title") else "category"
+                )
+                if kind == "page":
+                    importer.add_page(
+                        record["category"],
+                        record["title"],
+                        record["url"],
+                        as_int(record.get("views")),
+                    )
+                else:
+                    importer.add_category(
+                        record.get("name") or record["category"],
+                        as_int(record.get("views")),
+                        as_int(record.get("likes")),
+                    )
+            importer.finish()
+
+        elapsed = time.perf_counter() - start
+        rows = importer.categories + importer.pages
+        self.stdout.write(
+            f"Imported {importer.categories} categories and {importer.pages} pages "
+            f"in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):.0f} rows/sec)."
+        )
+        if importer.conflicts:
+            self.stdout.write(
+                f"Skipped {importer.conflicts} page update(s) whose URL another "
+                "page in the category already has."
+            )
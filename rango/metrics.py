@@ -0,0 +1,189 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = (
+    ("rango_request_duration_seconds", "Wall time per request.", TIME_BUCKETS),
+    ("rango_db_queries", "SQL queries per request.", QUERY_BUCKETS),
+    ("rango_db_duration_seconds", "Time spent in SQL per request.", TIME_BUCKETS),
+    (
+        "rango_template_duration_seconds",
+        "Time spent rendering templates per request.",
+        TIME_BUCKETS,
+    ),
+    ("rango_response_size_bytes", "Response body size.", SIZE_BUCKETS),
+)
+
+_local = threading.local()
+
+
+class RequestStats:
+    # shared with the run_parallel threads working for the same request
+    __slots__ = ("queries", "sql_time", "template_time", "lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.lock = threading.Lock()
+
+    def add_query(self, elapsed):
+        with self.lock:
+            self.queries += 1
+            self.sql_time += elapsed
+
+    def add_template(self, elapsed):
+        with self.lock:
+            self.template_time += elapsed
+
+
+def current_stats():
+    return getattr(_local, "stats", None)
+
+
+def set_stats(stats):
+    _local.stats = stats
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram over a rolling window.
+
+    Observations go into the current window; once it is window seconds old
+    it becomes the previous one and a fresh window starts. Exports cover
+    both, i.e. between one and two windows of recent traffic.
+    """
+
+    def __init__(self, buckets, window):
+        self.buckets = buckets
+        self.window = window
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.current = self._empty()
+        self.previous = self._empty()
+
+    def _empty(self):
+        # per-bucket counts (the last one is +Inf), then sum
+        return [0] * (len(self.buckets) + 1), [0.0]
+
+    def _rotate(self, now):
+        if now - self.started >= self.window:
+            self.previous = (
+                self.current if now - self.started < 2 * self.window else self._empty()
+            )
+            self.current = self._empty()
+            self.started = now
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self._rotate(time.monotonic())
+            counts, total = self.current
+            counts[index] += 1
+            total[0] += value
+
+    def snapshot(self):
+        with self.lock:
+            self._rotate(time.monotonic())
+            counts = [a + b for a, b in zip(self.current[0], self.previous[0])]
+            total = self.current[1][0] + self.previous[1][0]
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def histogram(self, name, view, buckets):
+        key = (name, view)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(
+                    key, Histogram(buckets, settings.RANGO_METRICS_WINDOW)
+                )
+        return histogram
+
+    def observe(self, view, values):
+        for (name, _, buckets), value in zip(METRICS, values):
+            if value is not None:
+                self.histogram(name, view, buckets).observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms = {}
+
+    def export(self):
+        lines = []
+        histograms = sorted(self.histograms.items())
+        for name, help_text, buckets in METRICS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, view), histogram in histograms:
+                if metric != name:
+                    continue
+                cumulative, total = histogram.snapshot()
+                bounds = [repr(bound) for bound in buckets] + ["+Inf"]
+                for bound, count in zip(bounds, cumulative):
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {count}')
+                lines.append(f'{name}_sum{{view="{view}"}} {total}')
+                lines.append(f'{name}_count{{view="{view}"}} {cumulative[-1]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def record_sql(execute, sql, params, many, context):
+    stats = current_stats()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_sql_wrapper(sender, connection, **kwargs):
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class Template(DjangoTemplate):
+    def render(self, context=None, request=None):
+        stats = current_stats()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.add_template(time.perf_counter() - start)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every top-level render."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Template(template.template, self)
@@ -0,0 +1,174 @@
+import mimetypes
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from rango.metrics import RequestStats, registry, set_stats
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header):
+    """{coding: q-value} from an Accept-Encoding header; malformed q's are 0."""
+    accepted = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+class MetricsMiddleware:
+    """
+    Records per-view wall time, SQL count/time, template time and response
+    size into rolling histograms, and reports them in a Server-Timing header.
+
+    Keep this first in MIDDLEWARE so the wall time covers the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        set_stats(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            set_stats(None)
+        elapsed = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            view,
+            (elapsed, stats.queries, stats.sql_time, stats.template_time, size),
+        )
+
+        response["Server-Timing"] = (
+            f"app;dur={elapsed * 1000:.2f}, "
+            f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.queries} queries", '
+            f"tpl;dur={stats.template_time * 1000:.2f}"
+        )
+        return response
+
+
+class StaticFile:
+    __slots__ = ("path", "content_type", "immutable", "variants")
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.immutable = immutable
+        self.variants = [
+            (encoding, path + suffix)
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix)
+        ]
+
+
+class StaticFilesMiddleware:
+    """
+    Serves STATIC_URL from STATIC_ROOT, and MEDIA_URL from MEDIA_ROOT when
+    RANGO_SERVE_MEDIA is on, without going through URL resolution or views.
+
+    STATIC_ROOT is indexed once at startup, along with the .br/.gz copies
+    collectstatic left next to each file; the best one the client accepts
+    is sent. Responses are FileResponses, which the WSGI server writes out
+    through wsgi.file_wrapper (sendfile on gunicorn/uWSGI) rather than
+    reading the bytes in Python. Manifest-hashed names never change, so
+    they're cached for a year.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_prefix = settings.STATIC_URL
+        self.media_prefix = settings.MEDIA_URL if settings.RANGO_SERVE_MEDIA else None
+        self.files = self.index(settings.STATIC_ROOT)
+
+    def index(self, root):
+        hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        files = {}
+        if not root or not os.path.isdir(root):
+            return files
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith((".br", ".gz")) or name == "staticfiles.json":
+                    continue
+                path = os.path.join(directory, name)
+                url = os.path.relpath(path, root).replace(os.sep, "/")
+                files[url] = StaticFile(path, url in hashed)
+        return files
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            path = request.path_info
+            if path.startswith(self.static_prefix):
+                static = self.files.get(path[len(self.static_prefix) :])
+                if static is not None:
+                    return self.serve(request, static)
+            elif self.media_prefix and path.startswith(self.media_prefix):
+                media = self.find_media(path[len(self.media_prefix) :])
+                if media is not None:
+                    return self.serve(request, media)
+        return self.get_response(request)
+
+    def find_media(self, name):
+        try:
+            path = safe_join(settings.MEDIA_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        return StaticFile(path, False) if os.path.isfile(path) else None
+
+    def serve(self, request, static):
+        path, encoding = static.path, None
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        # the highest q wins; ENCODINGS' order only breaks ties
+        best = 0
+        for variant_encoding, variant_path in static.variants:
+            q = accepted.get(variant_encoding, accepted.get("*", 0))
+            if q > best:
+                best, path, encoding = q, variant_path, variant_encoding
+        if accepted.get("identity", 0) > best:
+            path, encoding = static.path, None
+
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime, stat.st_size
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, "rb"), content_type=static.content_type)
+            response["Last-Modified"] = http_date(stat.st_mtime)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        if static.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        response["Cache-Control"] = (
+            IMMUTABLE
+            if static.immutable
+            else f"public, max-age={settings.RANGO_STATIC_MAX_AGE}"
+        )
+        return response
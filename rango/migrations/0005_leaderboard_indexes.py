@@ -0,0 +1,21 @@
+# Generated by Django 2.2.11 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0004_auto_20200415_1128"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["likes"], name="rango_category_likes_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="page",
+            index=models.Index(fields=["views"], name="rango_page_views_idx"),
+        ),
+    ]
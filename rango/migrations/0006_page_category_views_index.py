@@ -0,0 +1,19 @@
+# Generated by Django 2.2.11 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0005_leaderboard_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="page",
+            index=models.Index(
+                fields=["category", "views"], name="rango_page_cat_views_idx"
+            ),
+        ),
+    ]
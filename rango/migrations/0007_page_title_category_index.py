@@ -0,0 +1,19 @@
+# Generated by Django 2.2.11 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0006_page_category_views_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="page",
+            index=models.Index(
+                fields=["title", "category"], name="rango_page_title_cat_idx"
+            ),
+        ),
+    ]
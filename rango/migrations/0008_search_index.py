@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# The SQL is spelled out rather than taken from rango.search, so later
+# changes to that module cannot change what this migration does.
+
+
+def fts5_available(connection):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return ("ENABLE_FTS5",) in cursor.fetchall()
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if not fts5_available(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS rango_search "
+            "USING fts5(title, url, tokenize='unicode61')"
+        )
+        cursor.execute(
+            "INSERT INTO rango_search (rowid, title, url) "
+            "SELECT id * 2, title, url FROM rango_page"
+        )
+        cursor.execute(
+            "INSERT INTO rango_search (rowid, title, url) "
+            "SELECT id * 2 + 1, name, '' FROM rango_category"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS rango_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0007_page_title_category_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
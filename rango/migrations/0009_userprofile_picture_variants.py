@@ -0,0 +1,18 @@
+# Generated by Django 2.2.11 on 2026-10-18 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0008_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="picture_variants",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.11 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0009_userprofile_picture_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="page",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.11 on 2026-10-18 18:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rango", "0010_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LikedCategories",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("bitmap", models.BinaryField(default=b"")),
+            ],
+            options={
+                "verbose_name_plural": "Liked categories",
+            },
+        ),
+    ]
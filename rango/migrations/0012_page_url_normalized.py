@@ -0,0 +1,64 @@
+# Generated by Django 2.2.11 on 2026-10-18 18:20
+
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import migrations, models
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url):
+    # rango.links.normalize_url as of this migration, copied so later
+    # changes to it can't change what the migration does
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    userinfo, at, host = parts.netloc.rpartition("@")
+    host = host.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and host.endswith(f":{default_port}"):
+        host = host[: -len(default_port) - 1]
+
+    path = parts.path.rstrip("/") or "/"
+    query = "&".join(sorted(param for param in parts.query.split("&") if param))
+    return urlunsplit((scheme, userinfo + at + host, path, query, ""))
+
+
+def normalize_page_urls(apps, schema_editor):
+    # Pages already added twice to a category are kept, but only the first
+    # gets a normalized URL; the rest stay NULL, which the constraint allows.
+    Page = apps.get_model("rango", "Page")
+    seen = set()
+    pages = []
+    for page in Page.objects.only("id", "category_id", "url").order_by("id"):
+        key = (page.category_id, normalize_url(page.url))
+        if key not in seen:
+            seen.add(key)
+            page.url_normalized = key[1]
+            pages.append(page)
+    Page.objects.bulk_update(pages, ["url_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0011_liked_categories"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="page",
+            name="url_normalized",
+            field=models.CharField(editable=False, max_length=208, null=True),
+        ),
+        migrations.RunPython(normalize_page_urls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="page",
+            constraint=models.UniqueConstraint(
+                fields=("category", "url_normalized"), name="rango_page_cat_url_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.11 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0012_page_url_normalized"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="page",
+            name="check_latency",
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="page",
+            name="check_status",
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="page",
+            name="checked_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
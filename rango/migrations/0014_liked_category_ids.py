@@ -0,0 +1,54 @@
+import struct
+
+from django.db import migrations, models
+
+
+def bitmaps_to_ids(apps, schema_editor):
+    LikedCategories = apps.get_model("rango", "LikedCategories")
+    rows = list(LikedCategories.objects.all())
+    for row in rows:
+        ids = [
+            index * 8 + bit
+            for index, byte in enumerate(bytes(row.bitmap))
+            for bit in range(8)
+            if byte >> bit & 1
+        ]
+        row.category_ids = struct.pack(f"<{len(ids)}I", *ids)
+    LikedCategories.objects.bulk_update(rows, ["category_ids"], batch_size=500)
+
+
+def ids_to_bitmaps(apps, schema_editor):
+    LikedCategories = apps.get_model("rango", "LikedCategories")
+    rows = list(LikedCategories.objects.all())
+    for row in rows:
+        packed = bytes(row.category_ids)
+        bits = bytearray()
+        for pk in struct.unpack(f"<{len(packed) // 4}I", packed):
+            index, bit = divmod(pk, 8)
+            if index >= len(bits):
+                bits.extend(bytes(index + 1 - len(bits)))
+            bits[index] |= 1 << bit
+        row.bitmap = bytes(bits)
+    LikedCategories.objects.bulk_update(rows, ["bitmap"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rango", "0013_page_link_check"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="likedcategories",
+            name="category_ids",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.AddField(
+            model_name="likedcategories",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(bitmaps_to_ids, ids_to_bitmaps),
+        migrations.RemoveField(model_name="likedcategories", name="bitmap"),
+    ]
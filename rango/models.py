@@ -1,7 +1,29 @@
+import json
+
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.template.defaultfilters import slugify
 
+from rango.links import normalize_url
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate page_count, total_page_views and top_page (the title of the
+        most viewed page, or None) in the same query as the categories.
+        """
+        top_pages = Page.objects.filter(category=OuterRef("pk")).order_by(
+            "-views", "-id"
+        )
+        return self.annotate(
+            page_count=Count("page"),
+            total_page_views=Coalesce(Sum("page__views"), 0),
+            top_page=Subquery(top_pages.values("title")[:1]),
+        )
+
 
 class Category(models.Model):
     NAME_MAX_LENGTH = 128
@@ -9,6 +31,10 @@ class Category(models.Model):
     views = models.IntegerField(default=0)
     likes = models.IntegerField(default=0)
     slug = models.SlugField(unique=True)
+    # also touched whenever one of the category's pages changes
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CategoryQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
         self.slug = slugify(self.name)
@@ -16,6 +42,7 @@ class Category(models.Model):
 
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [models.Index(fields=["likes"], name="rango_category_likes_idx")]
 
     def __str__(self):
         return self.name
@@ -27,17 +54,95 @@ class Page(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     title = models.CharField(max_length=TITLE_MAX_LENGTH)
     url = models.URLField(max_length=URL_MAX_LENGTH)
+    # normalize_url(url); null only for duplicates that predate the constraint
+    url_normalized = models.CharField(
+        max_length=URL_MAX_LENGTH + 8, null=True, editable=False
+    )
     views = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    # written by the check_links command; check_status stays None when the
+    # last check got no HTTP response at all
+    check_status = models.PositiveSmallIntegerField(null=True, editable=False)
+    check_latency = models.FloatField(null=True, editable=False)
+    checked_at = models.DateTimeField(null=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        normalized = normalize_url(self.url)
+        if (
+            self.pk is not None
+            and self.url_normalized is None
+            and Page.objects.filter(
+                category_id=self.category_id, url_normalized=normalized
+            )
+            .exclude(pk=self.pk)
+            .exists()
+        ):
+            # a duplicate from before the constraint stays NULL while
+            # another page in the category still holds its URL
+            normalized = None
+        self.url_normalized = normalized
+        super(Page, self).save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["views"], name="rango_page_views_idx"),
+            models.Index(fields=["category", "views"], name="rango_page_cat_views_idx"),
+            models.Index(fields=["title", "category"], name="rango_page_title_cat_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "url_normalized"], name="rango_page_cat_url_uniq"
+            )
+        ]
 
     def __str__(self):
         return self.title
 
 
+class LikedCategories(models.Model):
+    """
+    The categories a user has liked, as a sorted list of category ids packed
+    four bytes apiece (see rango.likes): one small row per user however many
+    categories they like. version is bumped on every change.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    category_ids = models.BinaryField(default=b"")
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Liked categories"
+
+    def __str__(self):
+        return self.user.username
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
 
     website = models.URLField(blank=True)
     picture = models.ImageField(upload_to="profile_images", blank=True)
+    # {"64": {"webp": name, "jpeg": name}, ...} filled in by rango.images
+    picture_variants = models.TextField(blank=True, default="", editable=False)
 
     def __str__(self):
         return self.user.username
+
+    @property
+    def variants(self):
+        return {
+            int(size): names
+            for size, names in json.loads(self.picture_variants or "{}").items()
+        }
+
+    def picture_url(self, size, fmt="jpeg"):
+        """
+        URL of the smallest resized picture at least size pixels across,
+        else the largest there is. None until the variants have been built.
+        """
+        variants = self.variants
+        if not variants:
+            return None
+        fits = [s for s in variants if s >= size]
+        chosen = min(fits) if fits else max(variants)
+        return self.picture.storage.url(variants[chosen][fmt])
@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from rango.caching import bump_version, get_version
+
+
+class PageCacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def export(self):
+        return (
+            "# TYPE rango_page_cache_hits_total counter\n"
+            f"rango_page_cache_hits_total {self.hits}\n"
+            "# TYPE rango_page_cache_misses_total counter\n"
+            f"rango_page_cache_misses_total {self.misses}\n"
+        )
+
+
+stats = PageCacheStats()
+
+
+def get_cache():
+    return caches[settings.RANGO_PAGE_CACHE_ALIAS]
+
+
+def page_key(request, vary=()):
+    # Every cached page embeds the sidebar, so any category change retires
+    # them all through the "categories" version; the per-path version lets
+    # single pages be purged.
+    path = request.path
+    parts = (
+        path,
+        get_version("categories"),
+        get_version(f"page:{path}"),
+        request.GET.urlencode(),
+        *vary,
+    )
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f"rango:page:{digest}"
+
+
+def purge(*paths):
+    for path in paths:
+        bump_version(f"page:{path}")
+
+
+def purge_index():
+    purge(reverse("index"), reverse("rango:index"))
+
+
+def purge_categories(*slugs):
+    purge(*(reverse("rango:show_category", args=[slug]) for slug in slugs))
+
+
+def cache_anonymous_page(on_hit=None, vary=None):
+    """
+    Serve anonymous GET/HEAD requests for the decorated view from the page
+    cache, before the view runs. Signed-in users always get the view.
+    Conditional requests are answered from the cached ETag/Last-Modified.
+
+    A view can leave something in request.page_cache_data to be stored with
+    the page; on_hit(request, data) is then called whenever that page is
+    served from the cache, so per-hit side effects are not lost.
+
+    vary(request), if given, returns more values for the cache key, such as
+    the versions of other caches the page is rendered from.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = page_key(request, vary(request) if vary else ())
+            cached = cache.get(key)
+            stats.record(hit=cached is not None)
+            if cached is not None:
+                response, data = cached
+                if on_hit is not None:
+                    on_hit(request, data)
+                # the cached validators are still current, as anything that
+                # would change them also retires the cached page
+                return get_conditional_response(
+                    request,
+                    etag=response.get("ETag"),
+                    last_modified=parse_http_date_safe(
+                        response.get("Last-Modified", "")
+                    ),
+                    response=response,
+                )
+
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+            ):
+                cache.set(
+                    key,
+                    (response, getattr(request, "page_cache_data", None)),
+                    settings.RANGO_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+from django.db.models import Q
+
+# the largest integer SQLite stores; a cursor past it can't name a row
+MAX_INTEGER = 2**63 - 1
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+def query_flag(request, name, default=False):
+    """?name=1/true/yes/on as True, any other value as False."""
+    if name not in request.GET:
+        return default
+    return request.GET[name].lower() in TRUTHY
+
+
+def parse_id(value):
+    """value as a non-negative integer an id column can hold, else ValueError."""
+    number = int(value)
+    if not 0 <= number <= MAX_INTEGER:
+        raise ValueError(f"{value!r} is out of range")
+    return number
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(views, pk):
+    return f"{views}_{pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        views, pk = cursor.split("_")
+        views = int(views)
+        if abs(views) > MAX_INTEGER:
+            return None
+        return views, parse_id(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def row_position(row):
+    # rows may be model instances or values() dicts
+    if isinstance(row, dict):
+        return row["views"], row["id"]
+    return row.views, row.id
+
+
+def order_by_views(queryset):
+    return queryset.order_by("-views", "-id")
+
+
+def keyset_paginate(queryset, cursor, per_page):
+    """
+    Return the page of queryset that follows cursor, most viewed first.
+
+    Seeking past the (views, id) of the last row shown means every page
+    costs the same index range scan, unlike OFFSET which has to walk over
+    every row before it.
+    """
+    queryset = order_by_views(queryset)
+    position = decode_cursor(cursor)
+    if position is not None:
+        views, pk = position
+        queryset = queryset.filter(Q(views__lt=views) | Q(views=views, id__lt=pk))
+
+    object_list = list(queryset[: per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = encode_cursor(*row_position(object_list[-1]))
+    return KeysetPage(object_list, next_cursor)
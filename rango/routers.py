@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+
+def replica_reads():
+    return getattr(_local, "replica", False)
+
+
+def set_replica_reads(enabled):
+    _local.replica = enabled
+
+
+@contextmanager
+def use_replica():
+    """Route the reads made inside this block to the read-only connection."""
+    previous = replica_reads()
+    set_replica_reads(True)
+    try:
+        yield
+    finally:
+        set_replica_reads(previous)
+
+
+def read_only_view(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Sends reads made under use_replica() to RANGO_REPLICA_DATABASE and
+    everything else to the default database. While the default database has
+    a transaction open, reads stay there so they see its uncommitted rows.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_reads() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return settings.RANGO_REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,186 @@
+import re
+from functools import lru_cache
+
+from django.db import connection, connections
+
+from rango.models import Category, Page
+
+# Pages and categories share one FTS5 table. Their rowids are interleaved
+# (2 * id for pages, 2 * id + 1 for categories) so either kind of row can be
+# replaced or removed by rowid without a scan.
+TABLE = "rango_search"
+PAGE = "page"
+CATEGORY = "category"
+
+
+def enabled(using=None):
+    using = using or connection
+    return using.vendor == "sqlite" and has_fts5(using.alias)
+
+
+@lru_cache(maxsize=None)
+def has_fts5(alias):
+    """Whether the SQLite library behind alias was built with FTS5."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return ("ENABLE_FTS5",) in cursor.fetchall()
+
+
+def rowid(kind, pk):
+    return pk * 2 + (1 if kind == CATEGORY else 0)
+
+
+def split_rowid(value):
+    return (CATEGORY if value % 2 else PAGE), value // 2
+
+
+def _replace(kind, pk, title, url=""):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [rowid(kind, pk)])
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, url) VALUES (%s, %s, %s)",
+            [rowid(kind, pk), title, url],
+        )
+
+
+def _remove(kind, pk):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [rowid(kind, pk)])
+
+
+def index_page(page):
+    _replace(PAGE, page.pk, page.title, page.url)
+
+
+def index_pages(pages):
+    if not enabled():
+        return
+    rows = [(rowid(PAGE, page.pk), page.title, page.url) for page in pages]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {TABLE} WHERE rowid = %s", [row[:1] for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, title, url) VALUES (%s, %s, %s)", rows
+        )
+
+
+def index_category(category):
+    _replace(CATEGORY, category.pk, category.name)
+
+
+def remove_page(pk):
+    _remove(PAGE, pk)
+
+
+def remove_pages(pks):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {TABLE} WHERE rowid = %s", [[rowid(PAGE, pk)] for pk in pks]
+        )
+
+
+def remove_category(pk):
+    _remove(CATEGORY, pk)
+
+
+def rebuild(using=None):
+    """Repopulate the whole index, e.g. after bulk loads that skip signals."""
+    using = using or connection
+    if not enabled(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, url) "
+            f"SELECT id * 2, title, url FROM {Page._meta.db_table}"
+        )
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, url) "
+            f"SELECT id * 2 + 1, name, '' FROM {Category._meta.db_table}"
+        )
+
+
+def match_expression(query):
+    # Quote every word so user input can never be read as FTS5 syntax, and
+    # let the last one match as a prefix while the user is still typing.
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchResult:
+    def __init__(self, kind, pk, title, url, slug=None):
+        self.kind = kind
+        self.id = pk
+        self.title = title
+        self.url = url
+        self.slug = slug
+
+
+def search(query, page=1, per_page=20):
+    """
+    Return (results, has_next) for one page of matches, best match first.
+    """
+    offset = (page - 1) * per_page
+    if not enabled():
+        return _search_fallback(query, offset, per_page)
+
+    expression = match_expression(query)
+    if expression is None:
+        return [], False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, title, url FROM {TABLE} WHERE {TABLE} MATCH %s "
+            "ORDER BY rank LIMIT %s OFFSET %s",
+            [expression, per_page + 1, offset],
+        )
+        rows = cursor.fetchall()
+
+    has_next = len(rows) > per_page
+    results = []
+    for value, title, url in rows[:per_page]:
+        kind, pk = split_rowid(value)
+        results.append(SearchResult(kind, pk, title, url))
+
+    category_ids = [r.id for r in results if r.kind == CATEGORY]
+    if category_ids:
+        slugs = dict(
+            Category.objects.filter(id__in=category_ids).values_list("id", "slug")
+        )
+        for result in results:
+            if result.kind == CATEGORY:
+                result.slug = slugs.get(result.id)
+        results = [r for r in results if r.kind == PAGE or r.slug]
+    return results, has_next
+
+
+def _search_fallback(query, offset, per_page):
+    query = query.strip()
+    if not query:
+        return [], False
+    limit = offset + per_page + 1
+    results = [
+        SearchResult(CATEGORY, pk, name, "", slug)
+        for pk, name, slug in Category.objects.filter(name__icontains=query)
+        .order_by("name")
+        .values_list("id", "name", "slug")[:limit]
+    ]
+    results += [
+        SearchResult(PAGE, pk, title, url)
+        for pk, title, url in Page.objects.filter(title__icontains=query)
+        .order_by("-views")
+        .values_list("id", "title", "url")[:limit]
+    ]
+    window = results[offset:limit]
+    return window[:per_page], len(window) > per_page
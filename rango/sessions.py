@@ -0,0 +1,75 @@
+"""
+Session engine (SESSION_ENGINE = "rango.sessions"): cached_db sessions that
+are only written back when their data has really changed.
+
+Django saves a session whenever it's marked modified, which assigning a
+value it already holds is enough to do; each save is a django_session
+write plus a cache write. Here a save whose data serializes the same as
+what was loaded is skipped, unless half the session's age has passed since
+it was last written, so active sessions still don't expire.
+
+The time of that last write is stored alongside the data under SAVED_AT,
+but taken out again on load, so it never shows up in the session's keys().
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+# when the session was last written, stored with the data so it comes back
+# from the cache as well as from the database
+SAVED_AT = "_rango_saved_at"
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.persisted = None
+        self.saved_at = 0
+
+    def load(self):
+        data = super().load()
+        self.saved_at = data.pop(SAVED_AT, 0)
+        self.persisted = self.serializer().dumps(data)
+        return data
+
+    def create_model_instance(self, data):
+        return super().create_model_instance({**data, SAVED_AT: self.saved_at})
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if (
+            not must_create
+            and self.session_key is not None
+            and self.persisted is not None
+            and self.serializer().dumps(data) == self.persisted
+            and time.time() - self.saved_at < self.get_expiry_age() / 2
+        ):
+            return
+        self.saved_at = int(time.time())
+        # CachedDBStore.save would cache the data without SAVED_AT
+        DBStore.save(self, must_create)
+        self._cache.set(
+            self.cache_key, {**data, SAVED_AT: self.saved_at}, self.get_expiry_age()
+        )
+        self.persisted = self.serializer().dumps(data)
+
+    @classmethod
+    def clear_expired(cls):
+        """
+        Delete expired sessions RANGO_SESSION_CLEANUP_BATCH_SIZE at a time,
+        each batch its own short statement, so the table is never locked
+        for the whole cleanup (run it with manage.py clearsessions).
+        """
+        batch_size = settings.RANGO_SESSION_CLEANUP_BATCH_SIZE
+        while True:
+            expired = Session.objects.filter(expire_date__lt=timezone.now())
+            deleted, _ = Session.objects.filter(
+                pk__in=expired.values("pk")[:batch_size]
+            ).delete()
+            if deleted < batch_size:
+                return
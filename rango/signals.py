@@ -0,0 +1,108 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rango import page_cache, search
+from rango.caching import bump_version
+from rango.counters import likes_flushed, views_flushed
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.models import Category, Page
+from rango.slugs import category_slugs
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # also retires every cached page, as they all show the sidebar
+    bump_version("categories")
+    category_slugs.invalidate()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    category_leaderboard.update_instance(instance)
+    search.index_category(instance)
+
+
+# category id -> page ids, for the categories this thread is deleting; the
+# cascaded pages' delete receivers leave their cleanup to category_deleted,
+# which does it once for the whole category
+deleting = threading.local()
+
+
+def deleting_categories():
+    if not hasattr(deleting, "pks"):
+        deleting.pks = {}
+    return deleting.pks
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    deleting_categories()[instance.pk] = list(
+        instance.page_set.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    page_ids = deleting_categories().pop(instance.pk, [])
+    category_leaderboard.discard(instance.pk)
+    search.remove_category(instance.pk)
+    # category_changed's version bump retires the cached pages
+    if page_ids:
+        page_leaderboard.invalidate()
+        search.remove_pages(page_ids)
+
+
+# Page changes only purge their own category's page and the index (whose
+# ETag covers the page stats), and rebuild the sidebar for the pages
+# rendered after them, so both show the new page count. Other cached pages
+# keep the old count in their sidebar until they expire, rather than every
+# cached page being retired through the "categories" version.
+@receiver(post_save, sender=Page)
+def page_saved(sender, instance, created, **kwargs):
+    page_leaderboard.update_instance(instance)
+    search.index_page(instance)
+    touch_categories(id=instance.category_id)
+    purge_pages(id=instance.category_id)
+    bump_version("sidebar")
+
+
+@receiver(post_delete, sender=Page)
+def page_deleted(sender, instance, **kwargs):
+    if instance.category_id in deleting_categories():
+        return
+    page_leaderboard.discard(instance.pk)
+    search.remove_page(instance.pk)
+    touch_categories(id=instance.category_id)
+    purge_pages(id=instance.category_id)
+    bump_version("sidebar")
+
+
+@receiver(views_flushed, sender=Page)
+def page_views_flushed(sender, pks, **kwargs):
+    page_leaderboard.refresh(pks)
+    # category pages are ordered by views
+    touch_categories(page__id__in=pks)
+    purge_pages(page__id__in=pks)
+
+
+@receiver(likes_flushed, sender=Category)
+def category_likes_flushed(sender, pks, **kwargs):
+    category_leaderboard.refresh(pks)
+    touch_categories(id__in=pks)
+    purge_pages(id__in=pks)
+
+
+def touch_categories(**lookups):
+    Category.objects.filter(**lookups).update(updated_at=timezone.now())
+
+
+def purge_pages(**lookups):
+    """Purge the cached index and the pages of the matching categories."""
+    page_cache.purge_index()
+    page_cache.purge_categories(
+        *Category.objects.filter(**lookups).values_list("slug", flat=True).distinct()
+    )
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rango.caching import bump_version, get_version
+from rango.models import Category
+
+VERSION = "category-slugs"
+
+
+class SlugCache:
+    """
+    Process-local LRU map from category slug to (id, name), or to None for
+    a slug no category has.
+
+    Entries live for RANGO_SLUG_CACHE_TIMEOUT seconds, and the least
+    recently used go once there are more than RANGO_SLUG_CACHE_SIZE.
+    Category signals call invalidate(), which empties this process's map
+    and bumps a version in the RANGO_VERSION_CACHE_ALIAS cache; every
+    other process sharing that cache empties its own map on its next
+    lookup after seeing the new version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, slug):
+        version = get_version(VERSION)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(slug)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(slug)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = Category.objects.filter(slug=slug).values_list("id", "name").first()
+        with self._lock:
+            # a newer version means the row may have changed since the read
+            if version == self._version:
+                expires = now + settings.RANGO_SLUG_CACHE_TIMEOUT
+                self._entries[slug] = (expires, value)
+                self._entries.move_to_end(slug)
+                while len(self._entries) > settings.RANGO_SLUG_CACHE_SIZE:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def forget(self, slug):
+        with self._lock:
+            self._entries.pop(slug, None)
+
+    def invalidate(self):
+        bump_version(VERSION)
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def export(self):
+        stats = self.stats()
+        return (
+            "# TYPE rango_slug_cache_hits_total counter\n"
+            f"rango_slug_cache_hits_total {stats['hits']}\n"
+            "# TYPE rango_slug_cache_misses_total counter\n"
+            f"rango_slug_cache_misses_total {stats['misses']}\n"
+            "# TYPE rango_slug_cache_evictions_total counter\n"
+            f"rango_slug_cache_evictions_total {stats['evictions']}\n"
+            "# TYPE rango_slug_cache_entries gauge\n"
+            f"rango_slug_cache_entries {stats['size']}\n"
+        )
+
+
+category_slugs = SlugCache()
+
+
+def category_from_slug(slug, verify=False):
+    """
+    An unsaved-looking Category carrying only id, name and slug, enough to
+    link to it or attach a Page to it, or None if no category has the slug.
+
+    verify=True checks a cached entry against the database first, for
+    callers about to write rows that point at the category.
+    """
+    found = category_slugs.get(slug)
+    if (
+        found is not None
+        and verify
+        and not Category.objects.filter(id=found[0], slug=slug).exists()
+    ):
+        category_slugs.forget(slug)
+        found = category_slugs.get(slug)
+    if found is None:
+        return None
+    pk, name = found
+    return Category(id=pk, name=name, slug=slug)
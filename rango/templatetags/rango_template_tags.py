@@ -1,10 +1,54 @@
 from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
 
-from rango.models import Category
+from rango.caching import get_version
+from rango.models import Category, UserProfile
+from rango.routers import use_replica
 
 register = template.Library()
 
 
+def get_sidebar_categories():
+    # "sidebar" is bumped by page changes, which only alter the page counts
+    key = f"rango:sidebar:{get_version('categories')}:{get_version('sidebar')}"
+    categories = cache.get(key)
+    if categories is None:
+        with use_replica():
+            categories = list(
+                Category.objects.with_stats()
+                .order_by("name")
+                .only("id", "name", "slug")
+            )
+        # reversed once here rather than on every render
+        for category in categories:
+            category.url = reverse("rango:show_category", args=[category.slug])
+        cache.set(
+            key, categories, getattr(settings, "RANGO_SIDEBAR_CACHE_TIMEOUT", 300)
+        )
+    return categories
+
+
 @register.inclusion_tag("rango/categories.html")
 def get_category_list(current_category=None):
-    return {"categories": Category.objects.all(), "current_category": current_category}
+    # the category list is shared by every request; only the highlight of
+    # current_category is worked out per request, in the template
+    return {
+        "categories": get_sidebar_categories(),
+        "current_category": current_category,
+    }
+
+
+@register.inclusion_tag("rango/avatar.html")
+def avatar(user, size=64):
+    # only the resized variants are ever linked, never the uploaded original
+    profile = UserProfile.objects.filter(user_id=user.pk).first()
+    if profile is None or profile.picture_url(size) is None:
+        return {}
+    return {
+        "size": size,
+        "webp": profile.picture_url(size, "webp"),
+        "jpeg": profile.picture_url(size, "jpeg"),
+        "alt": user.username,
+    }
@@ -1,3 +1,1639 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import signing
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.http import HttpResponseNotFound
+from django.template import engines
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from rango import page_cache, search
+from rango.caching import bump_version, get_version
+from rango.concurrency import run_parallel
+from rango.counters import (
+    ViewCounterBuffer,
+    like_counters,
+    request_flush,
+    view_counters,
+)
+from rango.db import apply_sqlite_pragmas
+from rango.forms import PageForm
+from rango.images import build_variants
+from rango.importer import add_pages
+from rango.leaderboards import page_leaderboard
+from rango.likes import add_liked, liked_ids
+from rango.linkcheck import LinkChecker
+from rango.links import normalize_url
+from rango.metrics import Histogram, RequestStats, registry
+from rango.middleware import StaticFile, StaticFilesMiddleware, accepted_encodings
+from rango.models import Category, Page, UserProfile
+from rango.pagination import keyset_paginate
+from rango.routers import use_replica
+from rango.sessions import SAVED_AT, SessionStore
+from rango.slugs import category_slugs
+from rango.templatetags.rango_template_tags import get_category_list
+from rango.visitors import SignedCookieVisitorBackend
+from rango.warmup import warm_templates
+from tango_with_django_project.settings import prod
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    category_slugs.clear()
+
+
+def update_queries(captured, table):
+    return [
+        q for q in captured.captured_queries if q["sql"].startswith(f'UPDATE "{table}"')
+    ]
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Python")
+        self.first = Page.objects.create(
+            category=self.category, title="Tutorial", url="http://a.com/"
+        )
+        self.second = Page.objects.create(
+            category=self.category, title="Docs", url="http://b.com/"
+        )
+
+    def tearDown(self):
+        view_counters.flush()
+
+    def test_concurrent_hits_collapse_into_one_update_per_row(self):
+        buffer = ViewCounterBuffer(flush_interval=3600, max_pending=1000)
+
+        def hit(page, times):
+            for _ in range(times):
+                buffer.incr(Page, page.id)
+
+        threads = [
+            threading.Thread(target=hit, args=(self.first, 10)) for _ in range(5)
+        ]
+        threads += [
+            threading.Thread(target=hit, args=(self.second, 10)) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(buffer.flush(), 2)
+
+        self.assertEqual(len(update_queries(captured, "rango_page")), 2)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.views, 50)
+        self.assertEqual(self.second.views, 30)
+
+    def test_flush_when_max_pending_reached(self):
+        buffer = ViewCounterBuffer(flush_interval=3600, max_pending=2)
+        buffer.incr(Page, self.first.id)
+        self.assertEqual(buffer.pending(Page, self.first.id), 1)
+
+        buffer.incr(Page, self.second.id)
+        self.assertEqual(buffer.pending(Page, self.first.id), 0)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+
+    def test_failed_flush_keeps_hits_for_the_next_one(self):
+        buffer = ViewCounterBuffer(flush_interval=3600, max_pending=1)
+        locked = OperationalError("database is locked")
+        with mock.patch("django.db.models.QuerySet.update", side_effect=locked):
+            with self.assertLogs("rango.counters", "WARNING"):
+                buffer.incr(Page, self.first.id)
+        self.assertEqual(buffer.pending(Page, self.first.id), 1)
+
+        buffer.flush()
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+
+    @override_settings(RANGO_VIEW_COUNTER_TIMER=True)
+    def test_a_timer_flushes_without_further_hits(self):
+        for interval, trigger in [(0.05, None), (3600, request_flush)]:
+            buffer = ViewCounterBuffer(flush_interval=interval)
+            flushed = threading.Event()
+
+            def flush():
+                buffer._pending.clear()
+                flushed.set()
+
+            with mock.patch.object(buffer, "flush", flush):
+                buffer.incr(Page, self.first.id)
+                if trigger:
+                    trigger()
+                self.assertTrue(flushed.wait(3))
+
+    def test_goto_redirects_and_counts(self):
+        response = self.client.get(reverse("rango:goto"), {"page_id": self.first.id})
+        self.assertRedirects(response, "http://a.com/", fetch_redirect_response=False)
+
+        view_counters.flush()
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+
+    def test_goto_unknown_page(self):
+        for page_id in ["nope", "9" * 23]:
+            response = self.client.get(reverse("rango:goto"), {"page_id": page_id})
+            self.assertRedirects(response, reverse("rango:index"))
+
+    def test_flush_command(self):
+        view_counters.incr(Page, self.first.id)
+        out = io.StringIO()
+        call_command("flush_view_counts", stdout=out)
+        self.assertIn("flushed 1 row(s) here", out.getvalue())
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+
+    def test_show_category_counts_views(self):
+        self.client.get(reverse("rango:show_category", args=[self.category.slug]))
+        self.client.get(reverse("rango:show_category", args=[self.category.slug]))
+
+        view_counters.flush()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.views, 2)
+
+
+class SidebarCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Category.objects.create(name="Python")
+
+    def test_second_render_issues_no_queries(self):
+        get_category_list()
+        with self.assertNumQueries(0):
+            context = get_category_list(self.python)
+        self.assertEqual(context["categories"], [self.python])
+        self.assertEqual(context["current_category"], self.python)
+
+    def test_category_writes_invalidate_the_list(self):
+        get_category_list()
+        django = Category.objects.create(name="Django")
+        self.assertEqual(get_category_list()["categories"], [django, self.python])
+
+        django.delete()
+        self.assertEqual(get_category_list()["categories"], [self.python])
+
+    def test_page_changes_refresh_the_counts(self):
+        def count():
+            return get_category_list()["categories"][0].page_count
+
+        count()
+        page = Page.objects.create(category=self.python, title="Docs", url="http://a/")
+        self.assertEqual(count(), 1)
+        add_pages(self.python, [("Blog", "http://b/")])
+        self.assertEqual(count(), 2)
+        page.delete()
+        self.assertEqual(count(), 1)
+
+        url = reverse("rango:show_category", args=["python"])
+        self.client.get(url)
+        Page.objects.create(category=self.python, title="Docs", url="http://a/")
+        self.assertContains(self.client.get(url), "Python</a> (2)", html=False)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Python")
+        self.pages = [
+            Page.objects.create(
+                category=self.category,
+                title=f"Page {i}",
+                url=f"http://{i}.com/",
+                views=i * 10,
+            )
+            for i in range(7)
+        ]
+
+    def titles(self):
+        return [entry["title"] for entry in page_leaderboard.top()]
+
+    def test_reads_come_from_the_cache(self):
+        page_leaderboard.top()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.titles(), ["Page 6", "Page 5", "Page 4", "Page 3", "Page 2"]
+            )
+
+    def test_saves_are_merged_incrementally(self):
+        page_leaderboard.top()
+        self.pages[0].views = 55
+        self.pages[0].save()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.titles(), ["Page 6", "Page 0", "Page 5", "Page 4", "Page 3"]
+            )
+
+    def test_changes_retire_other_workers_lists(self):
+        page_leaderboard.top()
+        version = get_version(page_leaderboard.version)
+        self.pages[1].views = 11
+        self.pages[1].save()
+        self.assertEqual(get_version(page_leaderboard.version), version)
+
+        self.pages[1].views = 500
+        self.pages[1].save()
+        self.assertNotEqual(get_version(page_leaderboard.version), version)
+
+    def test_lower_score_rebuilds_from_the_table(self):
+        page_leaderboard.top()
+        self.pages[6].views = 0
+        self.pages[6].save()
+        self.assertEqual(
+            self.titles(), ["Page 5", "Page 4", "Page 3", "Page 2", "Page 1"]
+        )
+
+    def test_flushed_views_reach_the_leaderboard(self):
+        page_leaderboard.top()
+        for _ in range(100):
+            view_counters.incr(Page, self.pages[1].id)
+        view_counters.flush()
+        self.assertEqual(self.titles()[0], "Page 1")
+
+    def test_the_cached_index_follows_the_leaderboards(self):
+        clear_caches()
+        self.client.get(reverse("rango:index"))
+        for _ in range(100):
+            view_counters.incr(Page, self.pages[1].id)
+        view_counters.flush()
+        response = self.client.get(reverse("rango:index"))
+        self.assertEqual(response.context["pages"][0]["title"], "Page 1")
+
+
+@override_settings(RANGO_CATEGORY_PAGE_SIZE=3, RANGO_STREAM_CHUNK_SIZE=2)
+class CategoryPaginationTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Python")
+        for i in range(8):
+            Page.objects.create(
+                category=self.category,
+                title=f"Page {i}",
+                url=f"http://{i}.com/",
+                views=i % 4,
+            )
+        self.url = reverse("rango:show_category", args=[self.category.slug])
+
+    def tearDown(self):
+        view_counters.flush()
+
+    def test_keyset_pages_cover_every_row_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(Page.objects.all(), cursor, 3)
+            seen += [(p.views, p.id) for p in page.object_list]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(set(seen)), 8)
+
+    def test_show_category_links_to_next_page(self):
+        response = self.client.get(self.url)
+        pages = response.context["pages"]
+        self.assertEqual(len(pages), 3)
+        self.assertContains(response, f"?after={response.context['next_cursor']}")
+
+        response = self.client.get(self.url, {"after": "garbage"})
+        self.assertEqual(response.context["pages"], pages)
+
+    def test_streaming_renders_every_page(self):
+        response = self.client.get(self.url, {"stream": 1})
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        for i in range(8):
+            self.assertIn(f"Page {i}<", content)
+        self.assertNotIn("rango:page-list", content)
+        self.assertIn("</html>", content)
+
+    def test_stream_flag_and_empty_categories(self):
+        for value in ("0", "false", "off"):
+            response = self.client.get(self.url, {"stream": value})
+            self.assertFalse(response.streaming)
+
+        Category.objects.create(name="Empty")
+        url = reverse("rango:show_category", args=["empty"])
+        response = self.client.get(url, {"stream": "true"})
+        self.assertContains(response, "No pages currently in category.")
+
+
+class ImportCommandTests(TestCase):
+    RECORDS = [
+        {"type": "category", "name": "Python", "views": 5, "likes": 3},
+        {"category": "Python", "title": "Docs", "url": "http://a.com/", "views": 4},
+        {"category": "Python", "title": "Tutorial", "url": "http://b.com/"},
+        {"category": "Rust", "title": "Book", "url": "http://c.com/", "views": 1},
+    ]
+
+    def import_records(self, records):
+        path = os.path.join(self.tmpdir, "import.jsonl")
+        with open(path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        call_command("import_rango", path, batch_size=2, stdout=io.StringIO())
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_import_is_idempotent(self):
+        self.import_records(self.RECORDS)
+        self.import_records(self.RECORDS)
+
+        self.assertEqual(
+            list(Category.objects.order_by("name").values_list("slug", "likes")),
+            [("python", 3), ("rust", 0)],
+        )
+        self.assertEqual(Page.objects.count(), 3)
+
+    def test_reimport_updates_changed_pages(self):
+        self.import_records(self.RECORDS)
+        changed = dict(self.RECORDS[1], views=40)
+        self.import_records([changed])
+
+        self.assertEqual(Page.objects.get(title="Docs").views, 40)
+        self.assertEqual(Page.objects.count(), 3)
+
+    def test_imported_categories_are_found_by_slug(self):
+        clear_caches()
+        self.assertIsNone(category_slugs.get("rust"))
+        self.import_records(self.RECORDS)
+        response = self.client.get(reverse("rango:show_category", args=["rust"]))
+        self.assertContains(response, "Book")
+
+    def test_pages_keep_their_existing_categorys_counters(self):
+        Category.objects.create(name="Python", views=50, likes=30)
+        self.import_records([self.RECORDS[1]])
+
+        category = Category.objects.get(slug="python")
+        self.assertEqual((category.views, category.likes), (50, 30))
+        self.assertEqual(category.page_set.count(), 1)
+
+    def test_updates_that_would_duplicate_a_url_are_skipped(self):
+        self.import_records(self.RECORDS)
+        python = Category.objects.get(slug="python")
+        # added twice before the constraint; the migration left this one NULL
+        legacy = Page.objects.create(category=python, title="Old", url="http://o/")
+        Page.objects.filter(id=legacy.id).update(
+            url="http://a.com", url_normalized=None
+        )
+
+        stdout = io.StringIO()
+        path = os.path.join(self.tmpdir, "import.jsonl")
+        with open(path, "w") as f:
+            for record in [
+                dict(self.RECORDS[2], url="HTTP://A.com/"),
+                {"category": "Python", "title": "Old", "url": "http://a.com/"},
+            ]:
+                f.write(json.dumps(record) + "\n")
+        call_command("import_rango", path, stdout=stdout)
+
+        self.assertIn("Skipped 1 page update(s)", stdout.getvalue())
+        self.assertEqual(Page.objects.get(title="Tutorial").url, "http://b.com/")
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.url, legacy.url_normalized), ("http://a.com/", None))
+
+    def test_csv(self):
+        path = os.path.join(self.tmpdir, "import.csv")
+        with open(path, "w") as f:
+            f.write("type,category,title,url,views,likes\n")
+            f.write("category,Python,,,5,3\n")
+            f.write("page,Python,Docs,http://a.com/,4,\n")
+        call_command("import_rango", path, stdout=io.StringIO())
+
+        self.assertEqual(Category.objects.get(slug="python").likes, 3)
+        self.assertEqual(Page.objects.get(title="Docs").views, 4)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.python = Category.objects.create(name="Python")
+        self.tutorial = Page.objects.create(
+            category=self.python,
+            title="Official Python Tutorial",
+            url="http://docs.python.org/3/tutorial/",
+        )
+        self.flask = Page.objects.create(
+            category=self.python, title="Flask", url="http://flask.pocoo.org/"
+        )
+
+    def kinds_and_ids(self, query, **kwargs):
+        results, has_next = search.search(query, **kwargs)
+        return [(r.kind, r.id) for r in results], has_next
+
+    def test_saves_are_indexed(self):
+        results, _ = self.kinds_and_ids("tutorial")
+        self.assertEqual(results, [(search.PAGE, self.tutorial.id)])
+
+        self.flask.title = "Flask tutorial"
+        self.flask.save()
+        results, _ = self.kinds_and_ids("tutorial")
+        self.assertEqual(len(results), 2)
+
+    def test_deletes_are_unindexed(self):
+        self.python.delete()
+        self.assertEqual(self.kinds_and_ids("python"), ([], False))
+
+    def test_matches_categories_urls_and_prefixes(self):
+        results, _ = self.kinds_and_ids("pyth")
+        self.assertIn((search.CATEGORY, self.python.id), results)
+        results, _ = self.kinds_and_ids("pocoo")
+        self.assertEqual(results, [(search.PAGE, self.flask.id)])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.kinds_and_ids('"NEAR( AND -*'), ([], False))
+
+    def test_pagination(self):
+        first, has_next = self.kinds_and_ids("python", per_page=1)
+        self.assertTrue(has_next)
+        second, has_next = self.kinds_and_ids("python", page=2, per_page=1)
+        self.assertFalse(has_next)
+        self.assertEqual(len(set(first + second)), 2)
+
+    def test_sqlite_without_fts5_falls_back(self):
+        with mock.patch("rango.search.has_fts5", return_value=False):
+            Page.objects.create(category=self.python, title="Django", url="http://d/")
+            results, _ = search.search("djan")
+        self.assertEqual([result.title for result in results], ["Django"])
+
+    def test_search_view(self):
+        response = self.client.get(reverse("rango:search"), {"q": "python"})
+        self.assertContains(response, "Official Python Tutorial")
+        self.assertContains(
+            response, reverse("rango:show_category", args=[self.python.slug])
+        )
+
+
+def write_queries(captured):
+    return [
+        q
+        for q in captured.captured_queries
+        if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+    ]
+
+
+class VisitorTrackingTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_about_without_a_session(self):
+        response = self.client.get(reverse("rango:about"))
+        self.assertEqual(response.context["visits"], 1)
+
+    def test_signed_cookie_backend_never_writes_to_the_database(self):
+        with CaptureQueriesContext(connection) as captured:
+            first = self.client.get(reverse("rango:about"))
+            second = self.client.get(reverse("rango:about"))
+
+        self.assertEqual(write_queries(captured), [])
+        self.assertIn(SignedCookieVisitorBackend.cookie_name, first.cookies)
+        self.assertNotIn(SignedCookieVisitorBackend.cookie_name, second.cookies)
+        self.assertContains(second, "Visits: 1")
+
+    def test_visit_counted_once_a_day(self):
+        backend = SignedCookieVisitorBackend()
+        two_days_ago = int(time.time()) - 2 * 24 * 60 * 60
+        self.client.cookies[backend.cookie_name] = signing.get_cookie_signer(
+            salt=backend.cookie_name + backend.salt
+        ).sign(f"3:{two_days_ago}")
+
+        response = self.client.get(reverse("rango:about"))
+        self.assertEqual(response.context["visits"], 4)
+
+    @override_settings(RANGO_VISITOR_BACKEND="rango.visitors.CacheVisitorBackend")
+    def test_cache_backend(self):
+        self.client.get(reverse("rango:about"))
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("rango:about"))
+        self.assertEqual(write_queries(captured), [])
+        self.assertContains(response, "Visits: 1")
+
+    @override_settings(RANGO_VISITOR_BACKEND="rango.visitors.SessionVisitorBackend")
+    def test_session_backend_only_writes_when_the_counter_changes(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("rango:index"))
+        self.assertTrue(write_queries(captured))
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("rango:about"))
+        self.assertEqual(write_queries(captured), [])
+        self.assertContains(response, "Visits: 1")
+
+
+class RunParallelTests(SimpleTestCase):
+    def test_results_keep_their_order(self):
+        results = run_parallel(lambda: 1, lambda: 2, lambda: 3)
+        self.assertEqual(results, [1, 2, 3])
+
+    def test_work_is_spread_over_the_pool(self):
+        names = run_parallel(*[lambda: threading.current_thread().name] * 3)
+        self.assertEqual(names[0], threading.current_thread().name)
+        self.assertTrue(all(name.startswith("rango-query") for name in names[1:]))
+
+    @override_settings(RANGO_QUERY_WORKERS=0)
+    def test_runs_inline_without_workers(self):
+        names = run_parallel(*[lambda: threading.current_thread().name] * 3)
+        self.assertEqual(set(names), {threading.current_thread().name})
+
+    def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            run_parallel(lambda: 1, lambda: 1 / 0)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        registry.clear()
+        self.category = Category.objects.create(name="Python")
+
+    def tearDown(self):
+        view_counters.flush()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("rango:about"))
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$',
+        )
+
+    def test_metrics_are_recorded_per_view(self):
+        url = reverse("rango:show_category", args=[self.category.slug])
+        self.client.get(url)
+        self.client.get(url)
+
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        response = self.client.get(reverse("rango:metrics"))
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn(
+            'rango_request_duration_seconds_count{view="rango:show_category"} 2',
+            body,
+        )
+        # the second request is a query-free page cache hit
+        self.assertIn(
+            'rango_db_queries_bucket{view="rango:show_category",le="0"} 1', body
+        )
+        self.assertIn(
+            'rango_template_duration_seconds_count{view="rango:show_category"} 2',
+            body,
+        )
+
+    def test_metrics_need_staff_or_the_token(self):
+        url = reverse("rango:metrics")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        with override_settings(RANGO_METRICS_TOKEN="s3cret"):
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer s3cret")
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer nope")
+            self.assertEqual(response.status_code, 302)
+
+    def test_queries_from_worker_threads_are_all_counted(self):
+        stats = RequestStats()
+        threads = [
+            threading.Thread(
+                target=lambda: [stats.add_query(0.001) for _ in range(1000)]
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.queries, 8000)
+
+    def test_histogram_window_rolls_over(self):
+        histogram = Histogram((1, 2), window=60)
+        histogram.observe(0.5)
+        histogram.observe(1.5)
+        self.assertEqual(histogram.snapshot(), ([1, 2, 2], 2.0))
+
+        histogram.started -= 60
+        histogram.observe(3)
+        self.assertEqual(histogram.snapshot(), ([1, 2, 3], 5.0))
+
+        histogram.started -= 120
+        self.assertEqual(histogram.snapshot(), ([0, 0, 0], 0.0))
+
+
+class ProfilePictureTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (1200, 800), "orange").save(buffer, "PNG")
+        self.user = User.objects.create_user("rango", password="secret")
+        self.profile = UserProfile.objects.create(
+            user=self.user,
+            picture=SimpleUploadedFile("big.png", buffer.getvalue()),
+        )
+
+    def test_variants_are_resized_and_content_addressed(self):
+        variants = build_variants(self.profile.pk)
+        self.assertEqual(set(variants), {"64", "256"})
+
+        name = variants["64"]["webp"]
+        with default_storage.open(name) as f:
+            self.assertEqual(Image.open(f).size, (64, 43))
+        with default_storage.open(name) as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:20]
+        self.assertEqual(name, f"profile_images/variants/{digest}-64.webp")
+
+    def test_picture_url_prefers_the_smallest_variant_that_fits(self):
+        self.assertIsNone(self.profile.picture_url(64))
+        build_variants(self.profile.pk)
+        self.profile.refresh_from_db()
+
+        self.assertIn("-64.jpeg", self.profile.picture_url(32))
+        self.assertIn("-256.webp", self.profile.picture_url(100, "webp"))
+        self.assertIn("-256.jpeg", self.profile.picture_url(1000))
+
+    def test_index_shows_the_resized_avatar(self):
+        build_variants(self.profile.pk)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("rango:index"))
+        self.assertContains(response, "-64.webp")
+        self.assertNotContains(response, "big.png")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["rango.hashers.PooledBCryptSHA256PasswordHasher"],
+    RANGO_BCRYPT_ROUNDS=4,
+)
+class PasswordHasherTests(TestCase):
+    def test_hashes_use_the_configured_work_factor(self):
+        user = User.objects.create_user("rango", password="secret")
+        self.assertTrue(user.password.startswith("bcrypt_sha256$$2b$04$"))
+        self.assertTrue(check_password("secret", user.password))
+        self.assertFalse(check_password("wrong", user.password))
+
+    def test_login_rehashes_with_a_new_work_factor(self):
+        User.objects.create_user("rango", password="secret")
+        with self.settings(RANGO_BCRYPT_ROUNDS=5):
+            self.assertTrue(self.client.login(username="rango", password="secret"))
+        self.assertIn("$2b$05$", User.objects.get(username="rango").password)
+
+    @override_settings(RANGO_HASHER_PROCESSES=1)
+    def test_hashing_in_the_process_pool(self):
+        encoded = make_password("secret")
+        self.assertTrue(check_password("secret", encoded))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Python")
+        Page.objects.create(category=self.category, title="Docs", url="http://a.com/")
+        self.url = reverse("rango:show_category", args=[self.category.slug])
+
+    def tearDown(self):
+        view_counters.flush()
+
+    def test_category_not_modified_is_a_single_lookup(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        etag = response["ETag"]
+
+        caches[settings.RANGO_PAGE_CACHE_ALIAS].clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # answered from the cached page's validators once it is cached again
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_modified_responses_count_as_views(self):
+        # signed in, so the 304 comes from condition() not the page cache
+        self.client.force_login(User.objects.create_user("rango"))
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        view_counters.flush()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.views, 2)
+
+    def test_category_etag_changes_with_its_pages(self):
+        etag = self.client.get(self.url)["ETag"]
+        Page.objects.create(category=self.category, title="Blog", url="http://b.com/")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Blog")
+
+    def test_category_etag_varies_by_user_and_query(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get(self.url, {"after": "1_1"})["ETag"], etag)
+
+        self.client.force_login(User.objects.create_user("rango"))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_index_not_modified_without_queries(self):
+        etag = self.client.get(reverse("rango:index"))["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("rango:index"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.create(name="Django")
+        response = self.client.get(reverse("rango:index"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Python")
+        self.page = Page.objects.create(
+            category=self.category, title="Docs", url="http://a.com/"
+        )
+        self.url = reverse("rango:show_category", args=[self.category.slug])
+
+    def tearDown(self):
+        view_counters.flush()
+
+    def test_anonymous_pages_are_served_from_the_cache(self):
+        hits = page_cache.stats.hits
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Docs")
+        self.assertEqual(page_cache.stats.hits, hits + 1)
+
+        view_counters.flush()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.views, 2)
+
+    def test_signed_in_users_bypass_the_cache(self):
+        self.client.get(self.url)
+        self.client.force_login(User.objects.create_user("rango"))
+        response = self.client.get(self.url)
+        self.assertContains(response, "Add a Page")
+
+    def test_page_changes_purge_their_category_and_the_index(self):
+        other = Category.objects.create(name="Django")
+        other_url = reverse("rango:show_category", args=[other.slug])
+        for url in (self.url, other_url, reverse("rango:index")):
+            self.client.get(url)
+
+        self.page.title = "Documentation"
+        self.page.save()
+
+        misses = page_cache.stats.misses
+        self.assertContains(self.client.get(self.url), "Documentation")
+        self.assertContains(self.client.get(reverse("rango:index")), "Documentation")
+        self.client.get(other_url)
+        self.assertEqual(page_cache.stats.misses, misses + 2)
+
+    def test_adding_and_deleting_pages_leaves_other_categories_cached(self):
+        other = Category.objects.create(name="Django")
+        other_url = reverse("rango:show_category", args=[other.slug])
+        self.client.get(self.url)
+        self.client.get(other_url)
+
+        page = Page.objects.create(
+            category=self.category, title="Blog", url="http://b/"
+        )
+        self.assertContains(self.client.get(self.url), "Blog")
+        page.delete()
+        self.assertNotContains(self.client.get(self.url), "Blog")
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+        add_pages(self.category, [("Bulk", "http://c/")])
+        self.assertContains(self.client.get(self.url), "Bulk")
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+    def test_category_changes_purge_every_page(self):
+        self.client.get(self.url)
+        Category.objects.create(name="Django")
+        self.assertContains(self.client.get(self.url), "Django")
+
+    def test_pages_showing_the_visit_count_are_cached_per_count(self):
+        self.client.get(reverse("rango:about"))
+        response = Client().get(reverse("rango:about"))
+        self.assertContains(response, "Visits: 1")
+
+        # the index doesn't show the count, so every visitor shares one copy
+        backend = SignedCookieVisitorBackend()
+        self.client.cookies[backend.cookie_name] = signing.get_cookie_signer(
+            salt=backend.cookie_name + backend.salt
+        ).sign(f"7:{int(time.time())}")
+        Client().get(reverse("rango:index"))
+        hits = page_cache.stats.hits
+        self.client.get(reverse("rango:index"))
+        self.assertEqual(page_cache.stats.hits, hits + 1)
+        response = self.client.get(reverse("rango:about"))
+        self.assertContains(response, "Visits: 7")
+
+    def test_cached_missing_categories_count_no_views(self):
+        url = reverse("rango:show_category", args=["missing"])
+        self.client.get(url)
+        with mock.patch.object(view_counters, "incr") as incr:
+            self.assertContains(self.client.get(url), "does not exist")
+        incr.assert_not_called()
+
+    def test_deleting_a_category_skips_per_page_work(self):
+        def deletion_queries(pages):
+            category = Category.objects.create(name=f"Bulk {pages}")
+            Page.objects.bulk_create(
+                Page(category=category, title=f"{i}", url=f"http://{i}/")
+                for i in range(pages)
+            )
+            with CaptureQueriesContext(connection) as captured:
+                category.delete()
+            return len(captured)
+
+        self.assertEqual(deletion_queries(2), deletion_queries(40))
+        self.assertFalse(Page.objects.filter(category__name__startswith="Bulk"))
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    @override_settings(TEMPLATES=prod.TEMPLATES)
+    def test_warm_up_fills_the_cached_loader(self):
+        names = warm_templates()
+        self.assertIn("rango/base.html", names)
+        self.assertIn("rango/category.html", names)
+
+        (loader,) = engines.all()[0].engine.template_loaders
+        for name in names:
+            self.assertIn(name, loader.get_template_cache)
+
+
+class SQLitePragmaTests(TestCase):
+    @override_settings(RANGO_SQLITE_PRAGMAS=[("cache_size", -1234)])
+    def test_pragmas_are_applied_to_new_connections(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+
+@override_settings(DATABASE_ROUTERS=["rango.routers.ReplicaRouter"])
+class ReplicaRouterTests(TransactionTestCase):
+    # the replica connection only sees committed rows, hence no TestCase
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Python")
+        self.addCleanup(self.category.delete)
+
+    def test_reads_under_use_replica_go_to_the_replica(self):
+        self.assertEqual(Category.objects.all().db, "default")
+        with use_replica():
+            categories = Category.objects.all()
+            self.assertEqual(categories.db, "replica")
+            self.assertEqual(list(categories), [self.category])
+            self.assertEqual(
+                run_parallel(
+                    lambda: Category.objects.all().db, lambda: Page.objects.all().db
+                ),
+                ["replica", "replica"],
+            )
+            with transaction.atomic():
+                self.assertEqual(Category.objects.all().db, "default")
+
+    def test_writes_go_to_the_default_database(self):
+        with use_replica():
+            category = Category.objects.get(pk=self.category.pk)
+            category.likes = 3
+            category.save()
+        self.assertEqual(Category.objects.get(pk=self.category.pk).likes, 3)
+
+    def test_the_replica_connection_is_read_only(self):
+        with self.assertRaises(OperationalError):
+            with connections["replica"].cursor() as cursor:
+                cursor.execute("DELETE FROM rango_category")
+
+
+class CategoryStatsTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def add_categories(self, count, start=0):
+        for i in range(start, start + count):
+            category = Category.objects.create(name=f"Category {i}", likes=i)
+            for views in (3, 7):
+                Page.objects.create(
+                    category=category,
+                    title=f"Page {i}-{views}",
+                    url=f"http://a.com/{views}/",
+                    views=views,
+                )
+
+    def query_count(self, func):
+        clear_caches()
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        return len(captured)
+
+    def test_with_stats(self):
+        self.add_categories(1)
+        Category.objects.create(name="Empty")
+        stats = {
+            c.name: (c.page_count, c.total_page_views, c.top_page)
+            for c in Category.objects.with_stats()
+        }
+        self.assertEqual(
+            stats, {"Category 0": (2, 10, "Page 0-7"), "Empty": (0, 0, None)}
+        )
+
+    def test_sidebar_and_index_use_a_constant_number_of_queries(self):
+        def render():
+            response = self.client.get(reverse("rango:index"))
+            self.assertContains(response, "2 pages, 10 views")
+            self.assertContains(response, "Category 0</a> (2)")
+
+        self.add_categories(2)
+        before = self.query_count(render)
+        self.add_categories(6, start=2)
+        self.assertEqual(self.query_count(render), before)
+
+    def test_admin_change_lists_use_a_constant_number_of_queries(self):
+        self.client.force_login(User.objects.create_superuser("admin", "", "pw"))
+        categories = reverse("admin:rango_category_changelist")
+        pages = reverse("admin:rango_page_changelist")
+
+        self.add_categories(2)
+        before = [
+            self.query_count(lambda: self.client.get(url))
+            for url in (categories, pages)
+        ]
+        self.add_categories(6, start=2)
+        after = [
+            self.query_count(lambda: self.client.get(url))
+            for url in (categories, pages)
+        ]
+        self.assertEqual(after, before)
+        self.assertContains(self.client.get(categories), "Page 7-7")
+
+
+class LikeCategoryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.python = Category.objects.create(name="Python")
+        self.django = Category.objects.create(name="Django")
+        self.url = reverse("rango:like_category")
+
+    def tearDown(self):
+        like_counters.flush()
+
+    def like(self, client, *ids):
+        return client.post(
+            self.url, json.dumps({"categories": ids}), content_type="application/json"
+        )
+
+    def test_liked_ids_round_trip(self):
+        packed, added = add_liked(b"", [3, 17, 3])
+        self.assertEqual(added, [3, 17])
+        self.assertEqual(liked_ids(packed), {3, 17})
+        self.assertEqual(add_liked(packed, [17, 4])[1], [4])
+        # four bytes per like, whatever the ids
+        self.assertEqual(len(add_liked(b"", [10_000_000])[0]), 4)
+
+    def test_requires_a_signed_in_user_and_a_valid_batch(self):
+        self.assertEqual(self.like(self.client, self.python.id).status_code, 403)
+        self.client.force_login(User.objects.create_user("rango"))
+        response = self.client.post(self.url, "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        for pk in [0, -1, 2**32, 10**23]:
+            self.assertEqual(self.like(self.client, pk).status_code, 400, pk)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_likes_are_batched_and_counted_once_per_user(self):
+        self.client.force_login(User.objects.create_user("rango"))
+        response = self.like(self.client, self.python.id, self.django.id, 999)
+        self.assertEqual(
+            response.json(),
+            {
+                "likes": {str(self.python.id): 1, str(self.django.id): 1},
+                "added": [self.python.id, self.django.id],
+            },
+        )
+
+        response = self.like(self.client, self.python.id)
+        self.assertEqual(
+            response.json(), {"likes": {str(self.python.id): 1}, "added": []}
+        )
+
+    def test_likes_from_many_users_flush_as_one_update(self):
+        for name in ("a", "b", "c"):
+            client = Client()
+            client.force_login(User.objects.create_user(name))
+            self.like(client, self.python.id)
+
+        with CaptureQueriesContext(connection) as captured:
+            like_counters.flush()
+        # the likes, then the updated_at touch from likes_flushed
+        self.assertEqual(len(update_queries(captured, "rango_category")), 2)
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.likes, 3)
+        self.assertContains(self.client.get(reverse("rango:index")), "Python")
+
+
+class APITests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Python")
+        for views in range(5):
+            Page.objects.create(
+                category=self.category,
+                title=f"Page {views}",
+                url=f"http://a.com/{views}/",
+                views=views,
+            )
+        self.url = reverse("rango:api_category_pages", args=[self.category.slug])
+
+    def test_pages_are_paginated_by_cursor(self):
+        titles, url = [], self.url + "?limit=2&fields=title"
+        while url:
+            data = self.client.get(url).json()
+            self.assertEqual(data["version"], 1)
+            titles += [row["title"] for row in data["results"]]
+            self.assertTrue(all(list(row) == ["title"] for row in data["results"]))
+            url = data["next"]
+        self.assertEqual(titles, [f"Page {views}" for views in range(4, -1, -1)])
+
+    def test_only_the_requested_columns_are_read(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url, {"fields": "title,url"})
+        (sql,) = [q["sql"] for q in captured if "rango_page" in q["sql"]]
+        self.assertNotIn('"rango_page"."updated_at"', sql)
+        self.assertNotIn('"rango_page"."category_id"', sql.split("FROM")[0])
+
+    def test_categories_with_stats(self):
+        response = self.client.get(
+            reverse("rango:api_categories"), {"fields": "slug,page_count,top_page"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"slug": "python", "page_count": 5, "top_page": "Page 4"}],
+        )
+        self.assertEqual(self.client.get("/rango/api/categories/").status_code, 200)
+
+    @override_settings(RANGO_STREAM_CHUNK_SIZE=2)
+    def test_streaming_and_gzip(self):
+        response = self.client.get(
+            self.url, {"stream": 1, "fields": "views"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        body = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(
+            json.loads(body)["results"],
+            [{"views": views} for views in range(4, -1, -1)],
+        )
+        for url in (self.url, reverse("rango:api_categories")):
+            for flag in ["0", "false", "no"]:
+                response = self.client.get(url, {"stream": flag})
+                self.assertFalse(response.streaming, (url, flag))
+
+    def test_errors(self):
+        self.assertEqual(
+            self.client.get(self.url, {"fields": "password"}).status_code, 400
+        )
+        for url in (self.url, reverse("rango:api_categories")):
+            for after in ["garbage", "9" * 23, "-1", "1_" + "9" * 23]:
+                response = self.client.get(url, {"after": after})
+                self.assertEqual(response.status_code, 400, (url, after))
+        missing = reverse("rango:api_category_pages", args=["missing"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class SlugCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Python")
+
+    def test_hot_slugs_skip_the_lookup(self):
+        expected = (self.category.id, "Python")
+        self.assertEqual(category_slugs.get("python"), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(category_slugs.get("python"), expected)
+        self.assertIsNone(category_slugs.get("missing"))
+        self.assertEqual(
+            category_slugs.stats(),
+            {"size": 2, "hits": 1, "misses": 2, "evictions": 0, "hit_rate": 1 / 3},
+        )
+
+    def test_category_changes_and_other_processes_invalidate(self):
+        category_slugs.get("python")
+        self.category.name = "Python 3"
+        self.category.save()
+        self.assertIsNone(category_slugs.get("python"))
+        self.assertEqual(category_slugs.get("python-3"), (self.category.id, "Python 3"))
+
+        # another worker's invalidation only reaches us through the version
+        bump_version("category-slugs")
+        with self.assertNumQueries(1):
+            category_slugs.get("python-3")
+
+    def test_prod_keeps_versions_in_a_cache_every_worker_shares(self):
+        alias = prod.RANGO_VERSION_CACHE_ALIAS
+        self.assertIn("FileBasedCache", prod.CACHES[alias]["BACKEND"])
+        # one version per category page, so the default 300 would cull them
+        self.assertGreaterEqual(prod.CACHES[alias]["OPTIONS"]["MAX_ENTRIES"], 10000)
+
+    def test_adding_pages_to_a_stale_category_redirects(self):
+        category_slugs.get("python")
+        # deleted by another worker, whose invalidation we haven't seen
+        with mock.patch.object(category_slugs, "invalidate"):
+            self.category.delete()
+        self.client.force_login(User.objects.create_user("rango"))
+        for name in ["rango:add_page", "rango:add_pages"]:
+            response = self.client.post(
+                reverse(name, args=["python"]),
+                {"title": "Docs", "url": "https://docs.python.org/", "urls": "x.org"},
+            )
+            self.assertRedirects(response, "/rango/", fetch_redirect_response=False)
+        self.assertFalse(Page.objects.exists())
+        self.assertIsNone(category_slugs.get("python"))
+
+    @override_settings(RANGO_SLUG_CACHE_SIZE=1)
+    def test_least_recently_used_are_evicted(self):
+        category_slugs.get("python")
+        category_slugs.get("missing")
+        self.assertEqual(category_slugs.stats()["evictions"], 1)
+        with self.assertNumQueries(1):
+            category_slugs.get("python")
+
+    @override_settings(RANGO_SLUG_CACHE_TIMEOUT=0)
+    def test_entries_expire(self):
+        category_slugs.get("python")
+        with self.assertNumQueries(1):
+            category_slugs.get("python")
+
+    def test_category_page_looks_the_category_up_by_id(self):
+        url = reverse("rango:show_category", args=["python"])
+        self.client.get(url)
+        self.client.force_login(User.objects.create_user("rango"))
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url)
+        category_queries = [
+            q["sql"] for q in captured if 'FROM "rango_category"' in q["sql"]
+        ]
+        self.assertEqual(len(category_queries), 1)
+        self.assertIn('"rango_category"."id" =', category_queries[0])
+
+
+class StaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(
+            STATIC_ROOT=os.path.join(self.root, "static"),
+            MEDIA_ROOT=os.path.join(self.root, "media"),
+            STATICFILES_STORAGE="rango.storage.CompressedManifestStaticFilesStorage",
+            RANGO_SERVE_MEDIA=True,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.script = staticfiles_storage.stored_name("js/rango-likes.js")
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponseNotFound())
+
+    def get(self, path, **headers):
+        return self.middleware(RequestFactory().get(path, **headers))
+
+    def test_collectstatic_precompresses_text_files(self):
+        self.assertTrue(staticfiles_storage.exists(self.script + ".gz"))
+        with staticfiles_storage.open(self.script + ".gz") as compressed:
+            with staticfiles_storage.open(self.script) as original:
+                self.assertEqual(gzip.decompress(compressed.read()), original.read())
+        image = staticfiles_storage.stored_name("images/rango.jpg")
+        self.assertFalse(staticfiles_storage.exists(image + ".gz"))
+
+    def test_hashed_files_are_immutable_and_negotiated(self):
+        response = self.get("/static/" + self.script, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["Content-Type"].endswith("/javascript"))
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        gzip.decompress(b"".join(response.streaming_content))
+
+        response = self.get("/static/" + self.script)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn(b"data-endpoint", b"".join(response.streaming_content))
+
+    def test_accept_encoding_is_parsed_with_q_values(self):
+        self.assertEqual(
+            accepted_encodings("abr, GZIP;q=0, deflate ; q=0.5, *;q=bad"),
+            {"abr": 1.0, "gzip": 0.0, "deflate": 0.5, "*": 0.0},
+        )
+        for header in ["gzip;q=0", "gzip;q=0.0, br", "xgzip", "*;q=0", ""]:
+            response = self.get("/static/" + self.script, HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header("Content-Encoding"), header)
+            response.close()
+        for header in ["gzip;q=0.5", "*", "br;q=0, *;q=0.1"]:
+            response = self.get("/static/" + self.script, HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(response["Content-Encoding"], "gzip", header)
+            response.close()
+
+    def test_the_highest_q_value_wins(self):
+        path = staticfiles_storage.path(self.script)
+        with open(path + ".br", "wb") as f:
+            f.write(b"brotli")
+        static = StaticFile(path, immutable=True)
+        for header, expected in [
+            ("gzip;q=1, br;q=0.1", "gzip"),
+            ("gzip, br", "br"),
+            ("gzip;q=0.5, br;q=0.5", "br"),
+            ("br;q=0.2, identity", None),
+        ]:
+            request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header)
+            response = self.middleware.serve(request, static)
+            self.assertEqual(response.get("Content-Encoding"), expected, header)
+            response.close()
+
+    def test_unhashed_names_and_conditional_requests(self):
+        response = self.get("/static/js/rango-likes.js")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        response.close()
+        response = self.get(
+            "/static/js/rango-likes.js",
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_media_and_unknown_files(self):
+        os.makedirs(settings.MEDIA_ROOT)
+        with open(os.path.join(settings.MEDIA_ROOT, "a.jpg"), "wb") as f:
+            f.write(b"jpeg")
+        response = self.get("/media/a.jpg")
+        self.assertEqual(b"".join(response.streaming_content), b"jpeg")
+        self.assertEqual(self.get("/media/../secret.key").status_code, 404)
+        self.assertEqual(self.get("/static/missing.js").status_code, 404)
+
+
+class BulkAddPagesTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Python")
+        Page.objects.create(
+            category=self.category, title="Docs", url="http://docs.python.org/3/"
+        )
+        self.url = reverse("rango:add_pages", args=["python"])
+        self.client.force_login(User.objects.create_user("rango"))
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("HTTP://Docs.Python.org:80/3/?b=2&a=1#intro"),
+            "http://docs.python.org/3?a=1&b=2",
+        )
+        self.assertEqual(normalize_url("example.com"), "http://example.com/")
+        self.assertEqual(
+            normalize_url("https://example.com:443/"), "https://example.com/"
+        )
+        self.assertNotEqual(
+            normalize_url("https://example.com/Path"),
+            normalize_url("https://example.com/path"),
+        )
+
+    def test_page_form_keeps_https_and_rejects_duplicates(self):
+        form = PageForm(
+            {"title": "Secure", "url": "https://python.org/", "views": 0},
+            category=self.category,
+        )
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["url"], "https://python.org/")
+
+        form = PageForm(
+            {"title": "Again", "url": "http://DOCS.python.org/3", "views": 0},
+            category=self.category,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("url", form.errors)
+
+    def test_admin_rejects_duplicate_urls(self):
+        Page.objects.create(category=self.category, title="Docs", url="http://a.com/")
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "password")
+        )
+        response = self.client.post(
+            reverse("admin:rango_page_add"),
+            {
+                "category": self.category.id,
+                "title": "Again",
+                "url": "http://A.com",
+                "views": 0,
+            },
+        )
+        self.assertContains(response, "This page is already in the category.")
+        self.assertFalse(Page.objects.filter(title="Again").exists())
+
+    def test_legacy_duplicates_can_still_be_saved(self):
+        original = Page.objects.create(
+            category=self.category, title="Docs", url="http://a.com/"
+        )
+        legacy = Page.objects.create(
+            category=self.category, title="Old", url="http://o.com/"
+        )
+        Page.objects.filter(id=legacy.id).update(
+            url="HTTP://A.com", url_normalized=None
+        )
+        legacy.refresh_from_db()
+        legacy.views = 3
+        legacy.save()
+        self.assertIsNone(Page.objects.get(id=legacy.id).url_normalized)
+
+        original.delete()
+        legacy.save()
+        self.assertEqual(legacy.url_normalized, "http://a.com/")
+
+    def test_add_pages_dedupes_and_inserts_in_one_statement(self):
+        entries = [
+            ("Tutorial", "http://docs.python.org/3/tutorial/"),
+            ("Tutorial again", "http://docs.python.org/3/tutorial"),
+            ("Docs again", "http://docs.python.org/3"),
+            ("PEPs", "https://peps.python.org/?b=1&a=2"),
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            added, skipped = add_pages(self.category, entries)
+        inserts = [
+            q
+            for q in captured
+            if q["sql"].startswith("INSERT") and 'INTO "rango_page"' in q["sql"]
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(added), 2)
+        self.assertEqual(
+            skipped,
+            ["http://docs.python.org/3/tutorial", "http://docs.python.org/3"],
+        )
+        self.assertEqual(Page.objects.filter(category=self.category).count(), 3)
+        results, _ = search.search("Tutorial")
+        self.assertEqual([result.title for result in results], ["Tutorial"])
+
+    def test_paste_and_json_upload(self):
+        response = self.client.post(
+            self.url,
+            {
+                "urls": "http://a.com/ Page A\nnot a url\nhttp://docs.python.org/3/",
+                "upload": SimpleUploadedFile(
+                    "pages.json",
+                    json.dumps([{"title": "Page B", "url": "http://b.com/"}]).encode(),
+                ),
+            },
+        )
+        self.assertContains(response, "Added 2 pages.")
+        self.assertEqual(response.context["duplicates"], ["http://docs.python.org/3/"])
+        self.assertEqual(response.context["rejected"], ["not"])
+        self.assertEqual(
+            set(Page.objects.values_list("title", flat=True)),
+            {"Docs", "Page A", "Page B"},
+        )
+
+    @override_settings(RANGO_BULK_PAGE_LIMIT=1)
+    def test_limit_and_bad_uploads(self):
+        response = self.client.post(self.url, {"urls": "http://a.com/\nhttp://b.com/"})
+        self.assertContains(response, "At most 1 pages")
+        response = self.client.post(
+            self.url, {"upload": SimpleUploadedFile("pages.json", b"{oops")}
+        )
+        self.assertContains(response, "must be a JSON list")
+        self.assertEqual(Page.objects.count(), 1)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = []
+    requests = []
+    active = 0
+    most_active = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        self.connections.append(self.client_address)
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(body=False)
+
+    def do_GET(self):
+        self.respond(body=True)
+
+    def respond(self, body):
+        cls = type(self)
+        cls.requests.append((self.command, self.path))
+        if self.path == "/hang":
+            time.sleep(1)
+        elif self.path.startswith("/slow"):
+            with cls.lock:
+                cls.active += 1
+                cls.most_active = max(cls.most_active, cls.active)
+            time.sleep(0.05)
+            with cls.lock:
+                cls.active -= 1
+        refused = 405 if not body else 200
+        status = {"/gone": 404, "/no-head": refused, "/truncated": refused}.get(
+            self.path, 200
+        )
+        self.send_response(status)
+        if self.path == "/truncated" and body:
+            # promise more than is sent, then hang up
+            self.send_header("Content-Length", "10")
+            self.end_headers()
+            self.wfile.write(b"ok")
+            self.close_connection = True
+            return
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if body:
+            self.wfile.write(b"ok")
+
+
+class LinkCheckTests(TestCase):
+    def setUp(self):
+        StandInHandler.connections = []
+        StandInHandler.requests = []
+        StandInHandler.most_active = 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base = f"http://127.0.0.1:{server.server_port}"
+
+        category = Category.objects.create(name="Python")
+        self.pages = {
+            path: Page.objects.create(
+                category=category, title=path, url=self.base + path
+            ).pk
+            for path in ("/ok", "/no-head", "/gone", "/hang")
+        }
+
+    def check_links(self, *args):
+        out = io.StringIO()
+        call_command("check_links", "--timeout", "0.5", *args, stdout=out)
+        return out.getvalue()
+
+    def test_records_status_latency_and_time(self):
+        output = self.check_links("--per-host", "1")
+        self.assertIn("Checked 4 page(s)", output)
+        self.assertIn("1 broken, 1 unreachable", output)
+
+        checks = {
+            path: Page.objects.values_list(
+                "check_status", "check_latency", "checked_at"
+            ).get(pk=pk)
+            for path, pk in self.pages.items()
+        }
+        self.assertEqual(
+            {path: status for path, (status, _, _) in checks.items()},
+            {"/ok": 200, "/no-head": 200, "/gone": 404, "/hang": None},
+        )
+        self.assertTrue(all(latency > 0 for _, latency, _ in checks.values()))
+        self.assertTrue(all(checked_at for _, _, checked_at in checks.values()))
+        self.assertIn(("HEAD", "/no-head"), StandInHandler.requests)
+        self.assertIn(("GET", "/no-head"), StandInHandler.requests)
+
+    def test_connections_are_reused(self):
+        self.check_links("--per-host", "1")
+        # a fresh connection after the timed-out request, at most
+        self.assertLessEqual(len(StandInHandler.connections), 2)
+        self.assertGreaterEqual(len(StandInHandler.requests), 5)
+
+    def test_recently_checked_pages_are_skipped(self):
+        self.check_links("--limit", "2")
+        self.assertIn("Checked 2 page(s)", self.check_links("--limit", "3"))
+        self.assertIn("Checked 0 page(s)", self.check_links())
+        self.assertIn("Checked 4 page(s)", self.check_links("--older-than", "0"))
+
+    def test_per_host_limit(self):
+        rows = ((i, f"{self.base}/slow") for i in range(12))
+        results = []
+        asyncio.run(
+            LinkChecker(concurrency=12, per_host=3).run(rows, results.extend, 5)
+        )
+        self.assertEqual(len(results), 12)
+        self.assertEqual({status for _, status, _ in results}, {200})
+        self.assertEqual(StandInHandler.most_active, 3)
+
+    def test_truncated_bodies_count_as_unreachable(self):
+        rows = [(1, f"{self.base}/truncated"), (2, f"{self.base}/ok")]
+        results = []
+        asyncio.run(LinkChecker(concurrency=1).run(rows, results.extend))
+        self.assertEqual(
+            [(pk, status) for pk, status, _ in results], [(1, None), (2, 200)]
+        )
+
+    def test_a_failed_worker_stops_the_run_and_keeps_its_results(self):
+        checker = LinkChecker(concurrency=1)
+
+        async def check(url):
+            if url.endswith("/2"):
+                raise RuntimeError("boom")
+            return 200, 1.0
+
+        results = []
+        rows = ((i, f"{self.base}/{i}") for i in range(10))
+        with mock.patch.object(checker, "check", check):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(
+                    asyncio.wait_for(checker.run(rows, results.extend), timeout=5)
+                )
+        self.assertEqual([pk for pk, _, _ in results], [0, 1])
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        session = SessionStore()
+        session["visits"] = 1
+        session.save()
+        self.key = session.session_key
+
+    def session_writes(self, session):
+        with CaptureQueriesContext(connection) as captured:
+            session.save()
+        return update_queries(captured, "django_session")
+
+    def test_unchanged_sessions_are_not_written(self):
+        session = SessionStore(self.key)
+        session["visits"] = 1
+        self.assertEqual(self.session_writes(session), [])
+
+        session["visits"] = 2
+        self.assertEqual(len(self.session_writes(session)), 1)
+        cache.clear()
+        self.assertEqual(SessionStore(self.key)["visits"], 2)
+
+    def test_the_save_time_is_kept_out_of_the_session_data(self):
+        for reload in [False, True]:
+            if reload:
+                cache.clear()
+            session = SessionStore(self.key)
+            self.assertEqual(list(session.keys()), ["visits"])
+            self.assertGreater(session.saved_at, 0)
+
+    def test_unchanged_sessions_are_rewritten_before_they_expire(self):
+        stale = int(time.time()) - settings.SESSION_COOKIE_AGE
+        Session.objects.filter(pk=self.key).update(
+            session_data=SessionStore().encode({"visits": 1, SAVED_AT: stale})
+        )
+        cache.clear()
+        session = SessionStore(self.key)
+        session["visits"] = 1
+        self.assertEqual(len(self.session_writes(session)), 1)
+
+    @override_settings(
+        SESSION_ENGINE="rango.sessions", RANGO_SESSION_CLEANUP_BATCH_SIZE=2
+    )
+    def test_clearsessions_deletes_in_batches(self):
+        expired = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f"expired{i}", session_data="", expire_date=expired)
+            for i in range(5)
+        )
+        with CaptureQueriesContext(connection) as captured:
+            call_command("clearsessions")
+        deletes = [q for q in captured if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(list(Session.objects.values_list("pk", flat=True)), [self.key])
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from rango import views
+from rango import api, views
 
 app_name = "rango"
 
@@ -10,10 +10,28 @@ urlpatterns = [
     path(
         "category/<slug:category_name_slug>/", views.show_category, name="show_category"
     ),
+    path("goto/", views.goto_url, name="goto"),
+    path("like_category/", views.like_category, name="like_category"),
+    path("search/", views.search_pages, name="search"),
+    path("metrics/", views.metrics, name="metrics"),
+    path("api/v1/categories/", api.categories, name="api_categories"),
+    path(
+        "api/v1/categories/<slug:category_name_slug>/pages/",
+        api.category_pages,
+        name="api_category_pages",
+    ),
+    # unversioned URLs serve the current version
+    path("api/categories/", api.categories),
+    path("api/categories/<slug:category_name_slug>/pages/", api.category_pages),
     path("add_category/", views.add_category, name="add_category"),
     path(
         "category/<slug:category_name_slug>/add_page/", views.add_page, name="add_page"
     ),
+    path(
+        "category/<slug:category_name_slug>/add_pages/",
+        views.add_pages,
+        name="add_pages",
+    ),
     path("register/", views.register, name="register"),
     path("login/", views.user_login, name="login"),
     path("logout/", views.user_logout, name="logout"),
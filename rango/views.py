@@ -1,19 +1,61 @@
-from datetime import datetime
+import json
+from functools import wraps
+from itertools import islice
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
-
-from rango.forms import CategoryForm, PageForm, UserForm, UserProfileForm
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import condition, require_POST
+
+from rango import search
+from rango.caching import get_version
+from rango.concurrency import run_parallel
+from rango.conditional import (
+    category_etag,
+    category_for,
+    category_last_modified,
+    index_categories,
+    index_etag,
+)
+from rango.counters import view_counters
+from rango.forms import BulkPageForm, CategoryForm, PageForm, UserForm, UserProfileForm
+from rango.images import schedule_variants
+from rango.importer import add_pages as bulk_add_pages
+from rango.leaderboards import category_leaderboard, page_leaderboard
+from rango.likes import MAX_ID, like_categories
+from rango.metrics import registry
 from rango.models import Category, Page
+from rango.page_cache import cache_anonymous_page
+from rango.page_cache import stats as page_cache_stats
+from rango.pagination import keyset_paginate, order_by_views, query_flag
+from rango.routers import read_only_view
+from rango.slugs import category_from_slug, category_slugs
+from rango.visitors import track_visits
+
+PAGE_LIST_MARKER = "<!-- rango:page-list -->"
+
+
+def leaderboard_versions(request):
+    # the index lists both top-5s, which change without touching any page
+    return [
+        get_version(board.version) for board in (category_leaderboard, page_leaderboard)
+    ]
 
 
+@track_visits
+@cache_anonymous_page(vary=leaderboard_versions)
+@read_only_view
+@condition(etag_func=index_etag)
 def index(request):
-    category_list = Category.objects.order_by("-likes")[:5]
-    pages_list = Page.objects.order_by("-views")[:5]
-    visitor_cookie_handler(request)
+    category_list, pages_list = run_parallel(
+        lambda: index_categories(request), page_leaderboard.top
+    )
 
     context_dict = {
         "boldmessage": "Crunchy, creamy, cookie, candy, cupcake!",
@@ -23,30 +65,185 @@ def index(request):
     return render(request, "rango/index.html", context=context_dict)
 
 
+def visit_count(request):
+    # the page shows it, so it's cached once per count
+    return [request.visits]
+
+
+@track_visits
+@cache_anonymous_page(vary=visit_count)
 def about(request):
-    visitor_cookie_handler(request)
     context_dict = {
         "your_name": "Gregory Thomas",
-        "visits": request.session["visits"],
+        "visits": request.visits,
     }
     return render(request, "rango/about.html", context=context_dict)
 
 
+def count_cached_category_view(request, category_id):
+    # None for a cached "category does not exist" page
+    if category_id is not None:
+        view_counters.incr(Category, category_id)
+
+
+def count_revalidated_category_view(view):
+    # condition() answers a 304 without calling the view, which is where
+    # views are otherwise counted
+    @wraps(view)
+    def wrapper(request, category_name_slug):
+        response = view(request, category_name_slug)
+        if response.status_code == 304:
+            category = category_for(request, category_name_slug)
+            if category is not None:
+                view_counters.incr(Category, category.id)
+        return response
+
+    return wrapper
+
+
+@cache_anonymous_page(on_hit=count_cached_category_view)
+@count_revalidated_category_view
+@read_only_view
+@condition(etag_func=category_etag, last_modified_func=category_last_modified)
 def show_category(request, category_name_slug):
     context_dict = {}
+    streaming = query_flag(request, "stream", settings.RANGO_CATEGORY_STREAMING)
 
-    try:
-        category = Category.objects.get(slug=category_name_slug)
-        pages = Page.objects.filter(category=category)
-        context_dict["pages"] = pages
-        context_dict["category"] = category
-    except Category.DoesNotExist:
-        context_dict["category"] = None
+    # already looked up for the etag
+    category = category_for(request, category_name_slug)
+    context_dict["category"] = category
+    if category is None:
         context_dict["pages"] = None
+        return render(request, "rango/category.html", context=context_dict)
 
+    view_counters.incr(Category, category.id)
+    request.page_cache_data = category.id
+    pages = Page.objects.filter(category_id=category.id)
+
+    if streaming:
+        return stream_category(request, context_dict, order_by_views(pages))
+
+    page = keyset_paginate(
+        pages, request.GET.get("after"), settings.RANGO_CATEGORY_PAGE_SIZE
+    )
+    context_dict["pages"] = page.object_list
+    context_dict["next_cursor"] = page.next_cursor
     return render(request, "rango/category.html", context=context_dict)
 
 
+def stream_category(request, context_dict, pages):
+    # Render the page around a marker, then send the page list between the
+    # two halves a chunk at a time so no more than one chunk of Page rows is
+    # ever held in memory.
+    chunk_size = settings.RANGO_STREAM_CHUNK_SIZE
+    rows = pages.iterator(chunk_size=chunk_size)
+    first = list(islice(rows, chunk_size))
+    if not first:
+        context_dict["pages"] = []
+        return render(request, "rango/category.html", context=context_dict)
+
+    context_dict["streaming"] = True
+    html = render_to_string("rango/category.html", context_dict, request)
+    head, tail = html.split(PAGE_LIST_MARKER, 1)
+
+    def render_chunks():
+        yield head
+        yield render_to_string("rango/page_list.html", {"pages": first})
+        chunk = []
+        for page in rows:
+            chunk.append(page)
+            if len(chunk) >= chunk_size:
+                yield render_to_string("rango/page_list.html", {"pages": chunk})
+                chunk = []
+        if chunk:
+            yield render_to_string("rango/page_list.html", {"pages": chunk})
+        yield tail
+
+    return StreamingHttpResponse(render_chunks())
+
+
+def goto_url(request):
+    try:
+        page = Page.objects.only("url").get(id=request.GET.get("page_id"))
+    except (Page.DoesNotExist, ValueError, OverflowError):
+        return redirect(reverse("rango:index"))
+
+    view_counters.incr(Page, page.id)
+    return redirect(page.url)
+
+
+@require_POST
+def like_category(request):
+    """
+    Like a batch of categories: POST {"categories": [id, ...]} as JSON.
+    Each user's like of a category only counts once.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Log in to like categories."}, status=403)
+    try:
+        category_ids = {int(pk) for pk in json.loads(request.body)["categories"]}
+        if not all(0 < pk <= MAX_ID for pk in category_ids):
+            raise ValueError("category id out of range")
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse(
+            {"error": 'Expected {"categories": [id, ...]}.'}, status=400
+        )
+    if len(category_ids) > settings.RANGO_LIKE_BATCH_SIZE:
+        return JsonResponse(
+            {"error": f"At most {settings.RANGO_LIKE_BATCH_SIZE} categories a batch."},
+            status=400,
+        )
+
+    counts, added = like_categories(request.user, category_ids)
+    return JsonResponse(
+        {"likes": {str(pk): likes for pk, likes in counts.items()}, "added": added}
+    )
+
+
+def search_pages(request):
+    query = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    results, has_next = [], False
+    if query:
+        results, has_next = search.search(
+            query, page=page, per_page=settings.RANGO_SEARCH_PAGE_SIZE
+        )
+
+    context_dict = {
+        "query": query,
+        "results": results,
+        "page": page,
+        "previous_page": page - 1 if page > 1 else None,
+        "next_page": page + 1 if has_next else None,
+    }
+    return render(request, "rango/search.html", context=context_dict)
+
+
+def staff_or_metrics_token(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = settings.RANGO_METRICS_TOKEN
+        if token and constant_time_compare(
+            request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"
+        ):
+            return view(request, *args, **kwargs)
+        return staff_member_required(view)(request, *args, **kwargs)
+
+    return wrapper
+
+
+@staff_or_metrics_token
+def metrics(request):
+    return HttpResponse(
+        registry.export() + page_cache_stats.export() + category_slugs.export(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @login_required
 def add_category(request):
     form = CategoryForm()
@@ -64,18 +261,14 @@ def add_category(request):
 
 @login_required
 def add_page(request, category_name_slug):
-    try:
-        category = Category.objects.get(slug=category_name_slug)
-    except Category.DoesNotExist:
-        category = None
-
+    category = category_from_slug(category_name_slug, verify=request.method == "POST")
     if category is None:
         return redirect("/rango/")
 
     form = PageForm()
 
     if request.method == "POST":
-        form = PageForm(request.POST)
+        form = PageForm(request.POST, category=category)
 
         if form.is_valid():
             if category:
@@ -96,6 +289,29 @@ def add_page(request, category_name_slug):
     return render(request, "rango/add_page.html", context=context_dict)
 
 
+@login_required
+def add_pages(request, category_name_slug):
+    category = category_from_slug(category_name_slug, verify=request.method == "POST")
+    if category is None:
+        return redirect("/rango/")
+
+    form = BulkPageForm()
+    context_dict = {"category": category}
+
+    if request.method == "POST":
+        form = BulkPageForm(request.POST, request.FILES)
+
+        if form.is_valid():
+            added, skipped = bulk_add_pages(category, form.cleaned_data["entries"])
+            context_dict["added"] = len(added)
+            context_dict["duplicates"] = skipped
+            context_dict["rejected"] = form.cleaned_data["rejected"]
+            form = BulkPageForm()
+
+    context_dict["form"] = form
+    return render(request, "rango/add_pages.html", context=context_dict)
+
+
 def register(request):
     # boolean for telling the template if registration was sucessful
     # starts off as false and then set to true when successful
@@ -120,6 +336,8 @@ def register(request):
                 profile.picture = request.FILES["picture"]
 
             profile.save()
+            # resizing happens off the request path
+            schedule_variants(profile)
 
             registered = True
         else:
@@ -169,27 +387,3 @@ def user_logout(request):
 @login_required
 def restricted(request):
     return render(request, "rango/restricted.html")
-
-
-def get_server_side_cookie(request, cookie, default_val=None):
-    val = request.session.get(cookie)
-    if not val:
-        val = default_val
-    return val
-
-
-def visitor_cookie_handler(request):
-    visits = int(get_server_side_cookie(request, "visits", "1"))
-    last_visit_cookie = get_server_side_cookie(
-        request, "last_visit", str(datetime.now())
-    )
-    last_visit_time = datetime.strptime(last_visit_cookie[:-7], "%Y-%m-%d %H:%M:%S")
-
-    # if it's been more than a day since the last visit...
-    if (datetime.now() - last_visit_time).days > 0:
-        visits = visits + 1
-        request.session["last_visit"] = str(datetime.now())
-    else:
-        request.session["last_visit"] = last_visit_cookie
-
-    request.session["visits"] = visits
@@ -0,0 +1,135 @@
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+DAY = 24 * 60 * 60
+
+
+class VisitorBackend:
+    """
+    Stores a visitor's (visits, last_visit) pair between requests.
+
+    load() returns the stored pair or None for a new visitor; save() is only
+    called when the pair has changed, i.e. on a first visit or the first
+    visit of a new day.
+    """
+
+    def load(self, request):
+        raise NotImplementedError
+
+    def save(self, request, response, visits, last_visit):
+        raise NotImplementedError
+
+
+class SessionVisitorBackend(VisitorBackend):
+    """Keeps the counter in the session, whatever SESSION_ENGINE is set to."""
+
+    def load(self, request):
+        try:
+            return int(request.session["visits"]), int(request.session["last_visit"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save(self, request, response, visits, last_visit):
+        request.session["visits"] = visits
+        request.session["last_visit"] = last_visit
+
+
+class SignedCookieVisitorBackend(VisitorBackend):
+    """Keeps the counter in a signed cookie, so tracking never touches the DB."""
+
+    cookie_name = "rango_visits"
+    salt = "rango.visitors"
+
+    def load(self, request):
+        value = request.get_signed_cookie(self.cookie_name, None, salt=self.salt)
+        try:
+            visits, last_visit = value.split(":")
+            return int(visits), int(last_visit)
+        except (AttributeError, ValueError):
+            return None
+
+    def save(self, request, response, visits, last_visit):
+        response.set_signed_cookie(
+            self.cookie_name,
+            f"{visits}:{last_visit}",
+            salt=self.salt,
+            max_age=settings.RANGO_VISITOR_COOKIE_AGE,
+            httponly=True,
+        )
+
+
+class CacheVisitorBackend(VisitorBackend):
+    """
+    Keeps the counter in the cache under a signed visitor id cookie.
+
+    Useful where the counter should not be readable or replayable by the
+    client but sessions are still too expensive to write.
+    """
+
+    cookie_name = "rango_visitor"
+    salt = "rango.visitors"
+
+    def visitor_id(self, request):
+        return request.get_signed_cookie(self.cookie_name, None, salt=self.salt)
+
+    def load(self, request):
+        visitor_id = self.visitor_id(request)
+        if visitor_id is None:
+            return None
+        return cache.get(f"rango:visitor:{visitor_id}")
+
+    def save(self, request, response, visits, last_visit):
+        visitor_id = self.visitor_id(request)
+        if visitor_id is None:
+            visitor_id = uuid.uuid4().hex
+            response.set_signed_cookie(
+                self.cookie_name,
+                visitor_id,
+                salt=self.salt,
+                max_age=settings.RANGO_VISITOR_COOKIE_AGE,
+                httponly=True,
+            )
+        cache.set(
+            f"rango:visitor:{visitor_id}",
+            (visits, last_visit),
+            settings.RANGO_VISITOR_COOKIE_AGE,
+        )
+
+
+def get_backend():
+    return import_string(settings.RANGO_VISITOR_BACKEND)()
+
+
+def count_visit(stored, now):
+    """Return (visits, last_visit, changed) for a visit at now."""
+    if stored is None:
+        return 1, now, True
+    visits, last_visit = stored
+    # if it's been more than a day since the last visit...
+    if now - last_visit >= DAY:
+        return visits + 1, now, True
+    return visits, last_visit, False
+
+
+def track_visits(view):
+    """Count the visit and expose the total to the view as request.visits."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        backend = get_backend()
+        visits, last_visit, changed = count_visit(
+            backend.load(request), int(time.time())
+        )
+        request.visits = visits
+        response = view(request, *args, **kwargs)
+        if changed:
+            backend.save(request, response, visits, last_visit)
+        return response
+
+    return wrapper
@@ -0,0 +1,35 @@
+import os
+
+from django.template import engines
+
+
+def template_names(subdir="rango"):
+    """Yield (engine, name) for every template under <template dir>/<subdir>."""
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None:
+            continue
+        for directory in engine.dirs:
+            for dirpath, dirnames, filenames in os.walk(
+                os.path.join(directory, subdir)
+            ):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(".html"):
+                        path = os.path.relpath(
+                            os.path.join(dirpath, filename), directory
+                        )
+                        yield engine, path.replace(os.sep, "/")
+
+
+def warm_templates(subdir="rango"):
+    """
+    Compile every template under <template dir>/<subdir> so a cached loader
+    holds them before the first request arrives. Returns the names loaded;
+    a template that doesn't compile fails here instead of on a request.
+    """
+    names = []
+    for engine, name in template_names(subdir):
+        engine.get_template(name)
+        names.append(name)
+    return names
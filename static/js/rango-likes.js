@@ -0,0 +1,94 @@
+/*
+ * Like buttons: <button class="rango-like" data-category-id="3">Like</button>
+ * with the count in <span data-likes-for="3">. Clicks are counted on the
+ * page straight away and sent to the server together, in one batch at most
+ * DELAY ms after the first of them; the server's counts then replace the
+ * optimistic ones, which are rolled back if the batch fails.
+ */
+(function () {
+    "use strict";
+
+    var DELAY = 400;
+    var script = document.currentScript;
+    var endpoint = script.getAttribute("data-endpoint");
+    var pending = {};
+    var timer = null;
+
+    function csrfToken() {
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : "";
+    }
+
+    function counters(id) {
+        return document.querySelectorAll('[data-likes-for="' + id + '"]');
+    }
+
+    function buttons(id) {
+        return document.querySelectorAll('.rango-like[data-category-id="' + id + '"]');
+    }
+
+    function adjust(id, delta) {
+        counters(id).forEach(function (counter) {
+            counter.textContent = parseInt(counter.textContent, 10) + delta;
+        });
+    }
+
+    function setLiked(id, liked) {
+        buttons(id).forEach(function (button) {
+            button.disabled = liked;
+        });
+    }
+
+    function flush(keepalive) {
+        clearTimeout(timer);
+        timer = null;
+        var ids = Object.keys(pending);
+        if (!ids.length) {
+            return;
+        }
+        var batch = pending;
+        pending = {};
+
+        fetch(endpoint, {
+            method: "POST",
+            credentials: "same-origin",
+            keepalive: !!keepalive,
+            headers: {"Content-Type": "application/json", "X-CSRFToken": csrfToken()},
+            body: JSON.stringify({categories: ids.map(Number)})
+        }).then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            return response.json();
+        }).then(function (data) {
+            Object.keys(data.likes).forEach(function (id) {
+                counters(id).forEach(function (counter) {
+                    counter.textContent = data.likes[id];
+                });
+            });
+        }).catch(function () {
+            Object.keys(batch).forEach(function (id) {
+                adjust(id, -1);
+                setLiked(id, false);
+            });
+        });
+    }
+
+    document.addEventListener("click", function (event) {
+        var button = event.target.closest(".rango-like");
+        if (!button || button.disabled) {
+            return;
+        }
+        var id = button.getAttribute("data-category-id");
+        pending[id] = true;
+        adjust(id, 1);
+        setLiked(id, true);
+        if (timer === null) {
+            timer = setTimeout(flush, DELAY);
+        }
+    });
+
+    window.addEventListener("pagehide", function () {
+        flush(true);
+    });
+})();
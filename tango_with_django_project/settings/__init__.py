@@ -0,0 +1,19 @@
+"""
+Settings profiles; point DJANGO_SETTINGS_MODULE at one of them:
+
+    tango_with_django_project.settings.dev   runserver, populate_rango.py
+    tango_with_django_project.settings.prod  the deployed site (wsgi.py), benchmarks
+    tango_with_django_project.settings.test  manage.py test
+
+manage.py picks dev, or test for the test command.
+
+DJANGO_SETTINGS_MODULE=tango_with_django_project.settings, as set before
+the profiles existed (e.g. by the PythonAnywhere WSGI file), still works and
+gets dev, which is what the old settings.py was; point the deployment at
+prod to get its settings.
+"""
+
+import os
+
+if os.environ.get("DJANGO_SETTINGS_MODULE") == __name__:
+    from tango_with_django_project.settings.dev import *  # noqa: F401
@@ -0,0 +1,320 @@
+"""
+Django settings for tango_with_django_project project, shared by every
+profile: dev, prod and test extend this module.
+
+Generated by 'django-admin startproject' using Django 2.2.11.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+MEDIA_DIR = os.path.join(BASE_DIR, "media")
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = None
+with open("secret.key", "r") as f:
+    SECRET_KEY = f.readline().strip()
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = ["rangogrig.pythonanywhere.com", "localhost"]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rango",
+]
+
+MIDDLEWARE = [
+    "rango.middleware.MetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "tango_with_django_project.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "rango.metrics.InstrumentedDjangoTemplates",
+        "DIRS": [
+            TEMPLATE_DIR,
+        ],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "django.template.context_processors.media",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "tango_with_django_project.wsgi.application"
+
+# Compile every template under templates/rango when a WSGI worker starts.
+# Only worth it with the cached loader (see prod).
+
+RANGO_WARM_TEMPLATES = False
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+    },
+    # The same file over a second, query-only connection, for the read-only
+    # views (see rango.routers). Point it at a real replica if there is one.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "TEST": {"MIRROR": "default"},
+    },
+}
+
+DATABASE_ROUTERS = ["rango.routers.ReplicaRouter"]
+
+RANGO_REPLICA_DATABASE = "replica"
+
+# PRAGMA name/value pairs run on every new SQLite connection. WAL lets
+# readers carry on while a write is in progress (and writers while reads
+# are); NORMAL only syncs at checkpoints, which is safe in WAL mode.
+
+RANGO_SQLITE_PRAGMAS = [
+    ("journal_mode", "wal"),
+    ("synchronous", "normal"),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("cache_size", -64 * 1024),
+    ("busy_timeout", 5000),
+]
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "rango",
+    },
+    # Full-page cache for anonymous users. Any backend will do, e.g. to share
+    # pages between workers on one host:
+    #     "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    #     "LOCATION": os.path.join(BASE_DIR, "cache", "pages"),
+    # or a local Redis/memcached instance through its cache backend.
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "rango-pages",
+    },
+}
+
+# Version numbers that retire cached pages, sidebars and slug lookups
+# (rango.caching). With several workers this alias must be a cache they all
+# share, or a change made through one worker never reaches the others.
+
+RANGO_VERSION_CACHE_ALIAS = "default"
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Password Hashers
+# bcrypt_sha256 hashing runs in a pool of RANGO_HASHER_PROCESSES processes,
+# with a work factor that can be tuned per environment. Hashes with another
+# work factor are upgraded on the next login.
+
+PASSWORD_HASHERS = [
+    "rango.hashers.PooledBCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.BCryptPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+RANGO_BCRYPT_ROUNDS = 12
+RANGO_HASHER_PROCESSES = 2
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = "/static/"
+STATICFILES_DIRS = [
+    STATIC_DIR,
+]
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+
+# rango.middleware.StaticFilesMiddleware (prod only) serves STATIC_ROOT, and
+# MEDIA_ROOT when RANGO_SERVE_MEDIA is on. Files that aren't manifest-hashed
+# (and so may change under the same URL) are cached for this many seconds.
+
+RANGO_SERVE_MEDIA = False
+RANGO_STATIC_MAX_AGE = 3600
+
+
+# Media files
+MEDIA_URL = "/media/"
+MEDIA_ROOT = MEDIA_DIR
+
+# Profile pictures are resized into these widths (WebP and JPEG) by a pool of
+# this many worker threads (0 resizes inline once the upload is saved)
+
+RANGO_AVATAR_SIZES = (64, 256)
+RANGO_AVATAR_QUALITY = 85
+RANGO_IMAGE_WORKERS = 2
+
+# Restriced Page acces redirect URL
+LOGIN_URL = "rango:login"
+
+# View counters
+# Hits on Category/Page are buffered in-process and written back in batches,
+# by a timer thread every this many seconds, or sooner once this many rows
+# are pending.
+
+RANGO_VIEW_COUNTER_FLUSH_INTERVAL = 5.0
+RANGO_VIEW_COUNTER_MAX_PENDING = 1000
+RANGO_VIEW_COUNTER_TIMER = True
+
+# Category likes are posted in batches of at most this many categories and
+# buffered like the view counters above
+
+RANGO_LIKE_BATCH_SIZE = 100
+
+# Sidebar category list, invalidated through Category signals
+
+RANGO_SIDEBAR_CACHE_TIMEOUT = 300
+
+# Category slug -> (id, name) lookups kept in each process; all processes
+# drop theirs when a category changes (through the version kept in the
+# default cache, so share that cache between workers)
+
+RANGO_SLUG_CACHE_SIZE = 1024
+RANGO_SLUG_CACHE_TIMEOUT = 300
+
+# Index page leaderboards, kept up to date as likes/views change
+
+RANGO_LEADERBOARD_TIMEOUT = 300
+
+# Category pages are paginated on (views, id); streaming sends the whole
+# category instead, rendered this many Page rows at a time.
+
+RANGO_CATEGORY_PAGE_SIZE = 50
+RANGO_CATEGORY_STREAMING = False
+RANGO_STREAM_CHUNK_SIZE = 200
+
+# Most pages one bulk add (add_pages) accepts
+
+RANGO_BULK_PAGE_LIMIT = 1000
+
+# Full-text search results per page
+
+RANGO_SEARCH_PAGE_SIZE = 20
+
+# JSON API (/rango/api/v1/) rows per page: the default and the most a
+# client may ask for with ?limit=
+
+RANGO_API_PAGE_SIZE = 100
+RANGO_API_MAX_PAGE_SIZE = 1000
+
+# Visitor tracking for index/about. Only the first visit of a day is
+# written; pick where it goes:
+#   rango.visitors.SignedCookieVisitorBackend - signed cookie, no DB writes
+#   rango.visitors.CacheVisitorBackend - cache entry keyed by a visitor cookie
+#   rango.visitors.SessionVisitorBackend - the session (see SESSION_ENGINE)
+
+RANGO_VISITOR_BACKEND = "rango.visitors.SignedCookieVisitorBackend"
+RANGO_VISITOR_COOKIE_AGE = 365 * 24 * 60 * 60
+
+# Threads available for running a view's independent ORM reads side by side
+# (0 runs them one after another in the request thread)
+
+RANGO_QUERY_WORKERS = 4
+
+# Per-view request metrics served at /rango/metrics/, covering the last one
+# to two windows of this many seconds
+
+RANGO_METRICS_WINDOW = 60
+
+# The metrics page is for staff users, or for a scraper sending
+# "Authorization: Bearer <token>" when this is set
+
+RANGO_METRICS_TOKEN = None
+
+# Anonymous index/about/category pages are served from this cache alias
+
+RANGO_PAGE_CACHE_ALIAS = "pages"
+RANGO_PAGE_CACHE_TIMEOUT = 600
+
+# Cookies
+
+SESSION_EXPIRE_AT_BROWSER_CLOSE = True
+
+# Expired sessions are deleted (by manage.py clearsessions, when
+# SESSION_ENGINE is rango.sessions) this many rows per statement
+
+RANGO_SESSION_CLEANUP_BATCH_SIZE = 1000
+
+# SECURE_CONTENT_TYPE_NOSNIFF = True
+# SECURE_BROWSER_XSS_FILTER = True
+# SESSION_COOKIE_SECURE = True
+# SECURE_SSL_REDIRECT = True
+# CSRF_COOKIE_SECURE = True
+# X_FRAME_OPTIONS = "DENY"
@@ -0,0 +1,7 @@
+"""
+Settings for working on the project locally.
+"""
+
+from tango_with_django_project.settings.base import *  # noqa: F401
+
+DEBUG = True
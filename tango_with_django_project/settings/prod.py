@@ -0,0 +1,83 @@
+"""
+Settings for the deployed site: the base settings with debugging off,
+database connections kept open between requests, and every template
+compiled once per worker and then served from memory. Static files are
+collected under hashed names with precompressed copies (run collectstatic
+on deploy) and served by the worker with sendfile, as are uploads.
+Sessions are read from a cache shared by the workers and only written
+when they change.
+"""
+
+import os
+
+from tango_with_django_project.settings.base import *  # noqa: F401
+from tango_with_django_project.settings.base import (
+    BASE_DIR,
+    CACHES,
+    DATABASES,
+    MIDDLEWARE,
+    TEMPLATES,
+)
+
+DEBUG = False
+
+DATABASES = {
+    alias: {**database, "CONN_MAX_AGE": 600} for alias, database in DATABASES.items()
+}
+
+# Django only picks the cached loader implicitly when no loaders are given;
+# spell it out so adding a loader later can't quietly turn caching off.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if processor != "django.template.context_processors.debug"
+            ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+RANGO_WARM_TEMPLATES = True
+
+STATICFILES_STORAGE = "rango.storage.CompressedManifestStaticFilesStorage"
+
+# Ahead of MetricsMiddleware so asset hits stay out of the view histograms
+MIDDLEWARE = ["rango.middleware.StaticFilesMiddleware"] + MIDDLEWARE
+
+RANGO_SERVE_MEDIA = True
+
+# Sessions live in the database with a cache in front. The cache has to be
+# shared by every worker, or one could keep serving a session another has
+# logged out; a file cache does that on one host, memcached/Redis beyond.
+CACHES = {
+    **CACHES,
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "sessions"),
+    },
+    # the invalidation versions, for the same reason. There is one per
+    # cached category page, and culling at the default 300 entries could
+    # drop the shared ones and retire every cached page.
+    "versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "versions"),
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+SESSION_ENGINE = "rango.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+RANGO_VERSION_CACHE_ALIAS = "versions"
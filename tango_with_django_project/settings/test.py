@@ -0,0 +1,23 @@
+"""
+Settings for running the test suite: the base settings with a
+deliberately cheap password hasher so creating and logging in users doesn't
+dominate test time.
+"""
+
+from tango_with_django_project.settings.base import *  # noqa: F401
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+RANGO_BCRYPT_ROUNDS = 4
+RANGO_HASHER_PROCESSES = 0
+
+# TestCase wraps each test in a transaction on the default connection that
+# the replica connection can't see, so tests read from default unless they
+# turn the router on.
+DATABASE_ROUTERS = []
+
+# The flush timer's own connection would wait on the write lock TestCase's
+# transaction holds; tests flush explicitly instead.
+RANGO_VIEW_COUNTER_TIMER = False
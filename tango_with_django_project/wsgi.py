@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings")
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "tango_with_django_project.settings.prod"
+)
 
 application = get_wsgi_application()
+
+if settings.RANGO_WARM_TEMPLATES:
+    from rango.warmup import warm_templates
+
+    warm_templates()